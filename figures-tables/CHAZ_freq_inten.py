@@ -3,7 +3,7 @@ Adapted for code repository on 2024-02-26
 
 description: Supplementary Figure 8 - CHAZ intensity change for different GCMs and TCGIs
              Supplementary Figure 9 - CHAZ frequency change for different GCMs and TCGIs
-             plots data from data/CHAZ_freq.xlsx, data/CHAZ_int.xlsx; calulated by CHAZ_freq_inten_check.py
+             plots data from data/CHAZ_freq.xlsx, data/CHAZ_int.xlsx; calculated by risk-model-various/CHAZ_freq_inten_stats.py
             
 @author: simonameiler
 """
@@ -0,0 +1,354 @@
+"""
+Created on 2026-10-19
+
+description: Panels of the uncertainty and sensitivity figures. The statistics of
+             the panels (kernel densities and their points of maximum density)
+             are computed independently of the drawing, sequentially or on
+             worker processes (compute_panels), and the figures are drawn from
+             these results for every metric and sensitivity index. Stacked bars
+             are drawn with one barh call per parameter for all bars of a panel.
+             The figures of the paper are rendered in one run by render_figures.py.
+
+@author: simonameiler
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import seaborn as sns
+import matplotlib.pyplot as plt
+import matplotlib.patches as mpatches
+from matplotlib.legend_handler import HandlerBase
+
+from kde_grid import fit_kdes, max_density_points, plot_kdes
+from param_registry import PARAM_LABELS
+from results_catalog import metrics_long
+
+MODEL_COLORS = {'MIT': '#2b83ba',
+                'CHAZ': '#abdda4',
+                'STORM': '#fdae61',
+                'IBTrACS': '#d7191c'}
+MODEL_LABELS = ['MIT', 'CHAZ', 'STORM', 'IBTrACS_p']
+
+# font sizes of the SA and drivers figures
+PAPER_RC = {'font.size': 8,            # Default font size
+            'axes.titlesize': 9,       # Font size for figure part labels (A, B, C, etc.)
+            'axes.labelsize': 8,       # Font size for axis labels
+            'xtick.labelsize': 6,      # Font size for x-tick labels
+            'ytick.labelsize': 6,      # Font size for y-tick labels
+            'legend.fontsize': 7.5}    # Font size for legend
+
+DELTA_NAMES = {"main": "total",
+               "cc": "CC",
+               "soc": "SOC"}
+
+###########################################################################
+
+def compute_panels(func, tasks, max_workers=1):
+    """
+    [func(*task) for task in tasks], on worker processes if max_workers > 1.
+
+    Parameters
+    ----------
+    func : callable
+        Function computing the statistics of a panel, defined at module level.
+    tasks : list of tuple
+        Arguments of func for every panel.
+    max_workers : int, optional
+        Number of worker processes, None for the number of CPUs. Default: 1
+
+    Returns
+    -------
+    list
+        Results in the order of tasks.
+    """
+    if max_workers == 1:
+        return [func(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, *zip(*tasks)))
+
+def kde_panel(df):
+    """ Densities of the columns of df and their points of maximum density """
+    dens = fit_kdes(df)
+    return dens, max_density_points(df, dens, x_range=(-3, 10))
+
+def ua_output_dfs(years, regions, models, samples_dict):
+    """
+    Metric values of the main runs, one table per year with one column per
+    region, model and metric ('{reg}_{mdl}_{mtrc}_unc'); STORM has no 2090 runs.
+    """
+    runs = pd.DataFrame([(reg, mdl, year, 'main', samples_dict[mdl]) for year in years
+                         for reg in regions for mdl in models
+                         if not (year == 2090 and mdl == 'STORM')],
+                        columns=['region', 'model', 'year', 'delta', 'n_samples'])
+    long_df = metrics_long(runs).rename(columns={'aai_agg': 'EAD'})
+    output_dfs = {}
+    for year, year_df in long_df.groupby('year'):
+        output_dfs[year] = pd.DataFrame(
+            {f'{reg}_{mdl}_{mtrc}_unc': run_df[mtrc].to_numpy()
+             for (reg, mdl), run_df in year_df.groupby(['region', 'model'], sort=False)
+             for mtrc in ['EAD', 'rp100']})
+    return output_dfs
+
+def ua_panel_data(output_dfs, mtrc, year, reg, models):
+    """ Columns of the models available for metric mtrc in region reg and year """
+    output_df = output_dfs[year]
+    return output_df.loc[:, [f'{reg}_{mdl}_{mtrc}_unc' for mdl in models
+                             if f'{reg}_{mdl}_{mtrc}_unc' in output_df.columns]]
+
+def ua_panels(output_dfs, metrics, years, regions, models, max_workers=1):
+    """ kde_panel of every metric, year and region, by (mtrc, year, reg) """
+    keys = [(mtrc, year, reg) for mtrc in metrics for year in years for reg in regions]
+    tasks = [(ua_panel_data(output_dfs, *key, models),) for key in keys]
+    return dict(zip(keys, compute_panels(kde_panel, tasks, max_workers)))
+
+def plot_ua_figure(panels, mtrc, years, regions, file=None):
+    """
+    Figure 2 (EAD) and Supplementary Figure 2 (rp100): densities of all models.
+
+    Parameters
+    ----------
+    panels : dict
+        Output of ua_panels.
+    mtrc : str
+        'EAD' or 'rp100'.
+    years : list of int
+        Periods, one row each.
+    regions : list of str
+        Regions, one column each.
+    file : Path, optional
+        Save the figure to file.
+
+    Returns
+    -------
+    pd.DataFrame
+        Supplementary Table 1: point of maximum density of every column.
+    """
+    fig, ax = plt.subplots(nrows=2, ncols=4, figsize=(12, 6), sharex=False, sharey=True)
+    max_density_rows = []
+    for idx, year in enumerate(years):
+        for r, reg in enumerate(regions):
+            dens, points = panels[mtrc, year, reg]
+            colors = [MODEL_COLORS[col.split('_')[1]] for col in dens]
+            plot_kdes(ax[idx,r], dens, colors, fill=True)
+
+            sns.despine()
+            ax[0,r].set_xlim(-3,10)
+            ax[1,r].set_xlim(-3,25)
+            ax[0,r].text(0.5, 1.05, reg, transform=ax[0,r].transAxes, fontsize=12)
+            ax[idx,r].text(-0.1, 1.03, f'{"abcdefgh"[4*idx+r]})', transform=ax[idx,r].transAxes,
+                           fontsize=12)
+            max_density_rows += [(year, col, reg, point) for col, point in points.items()]
+
+        ax[idx,1].set_xlabel(f'{mtrc} change {year} (%)')
+        ax[idx,1].xaxis.set_label_coords(1.25, -.15)
+
+    handles = [mpatches.Rectangle((0, 0), 1, 1, color=color, alpha=1.)
+               for color in MODEL_COLORS.values()]
+    ax[1,3].legend(handles=handles, labels=MODEL_LABELS, loc="upper left", bbox_to_anchor=(1.1, 1.4))
+    plt.tight_layout()
+    if file is not None:
+        plt.savefig(file, dpi=300, facecolor='w', edgecolor='w', orientation='portrait',
+                    format='png', bbox_inches='tight', pad_inches=0.1)
+    return pd.DataFrame(max_density_rows,
+                        columns=['Year', 'Column', 'Region', 'Max Density Point'])
+
+class SingleColorHandler(HandlerBase):
+    def __init__(self, color, hatch=None, **kwargs):
+        super().__init__(**kwargs)
+        self.color = color
+        self.hatch = hatch
+
+    def create_artists(self, legend, orig_handle, x0, y0, width, height, fontsize, trans):
+        patch = plt.Rectangle([x0, y0], width, height, facecolor=self.color,
+                              edgecolor='k', hatch=self.hatch, transform=trans)
+        return [patch]
+
+def stacked_barh(ax, y, widths, height, colors, hatches=None):
+    """
+    Horizontal bars stacked from left to right, one barh call per series.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axes to plot on.
+    y : np.array
+        Position of every bar.
+    widths : np.array
+        Width of every bar (rows) and series (columns); NaN and negative values
+        are drawn as 0.
+    height : float
+        Height of the bars.
+    colors : list
+        Color of every series.
+    hatches : list, optional
+        Hatch of every series (None for no hatch).
+    """
+    widths = np.clip(np.nan_to_num(np.asarray(widths, dtype=float)), 0, None)
+    lefts = np.cumsum(widths, axis=1) - widths
+    hatches = hatches or [None] * len(colors)
+    for i_ser, (color, hatch) in enumerate(zip(colors, hatches)):
+        ax.barh(y, widths[:, i_ser], height=height, left=lefts[:, i_ser], color=color, hatch=hatch)
+
+def plot_sa_figure(si_arr, run_idx, salib, params, colors, hatch_patterns, regions,
+                   periods=(2050, 2090), label_x=0.5, label_fontsize=6.5, file=None):
+    """
+    Figure 3 and Supplementary Figures 3-5: stacked sensitivity indices of all
+    models, regions and periods, rp100 (lower bar) and EAD (upper bar) per region.
+
+    Parameters
+    ----------
+    si_arr : xr.DataArray
+        Output of sensitivity_summary.sensitivity_array.
+    run_idx : dict
+        Position of the run of (region, period, model) in si_arr.
+    salib : str
+        'S1' or 'ST'.
+    params : list of str
+        Parameters, in the order of the stacks.
+    colors : list
+        Color of every parameter.
+    hatch_patterns : dict
+        Hatch of the parameters drawn in a color.
+    regions : list of str
+        Regions, drawn from the bottom in reverse order.
+    periods : list of int, optional
+        Periods, one row each. Default: (2050, 2090)
+    label_x : float, optional
+        Position of the EAD and RP 100 labels in the first panel. Default: 0.5
+    label_fontsize : float, optional
+        Font size of the EAD and RP 100 labels. Default: 6.5
+    file : Path, optional
+        Save the figure to file.
+    """
+    small_shift = 0.15
+    bar_height = 0.25
+    output_btt = ['rp100', 'aai_agg']
+    region_btt = regions[::-1]
+    hatches = [hatch_patterns.get(color, None) for color in colors]
+    y_pos = np.arange(len(region_btt))
+
+    fig, axes = plt.subplots(figsize=(7.25, 3.6), nrows=2, ncols=4, sharey=True, sharex=True)
+    fig.subplots_adjust(bottom=0.20, hspace=0.35, wspace=0.15)
+
+    # STORM has no 2090 runs
+    models_per_row = [
+        ['MIT', 'CHAZ', 'STORM', 'IBTrACS'],
+        ['MIT', 'CHAZ', None, 'IBTrACS']
+    ]
+    for idx, per in enumerate(periods):
+        for ax, mdl in zip(axes[idx], models_per_row[idx]):
+            if mdl is None:
+                ax.axis('off')
+                continue
+            sens = si_arr[[run_idx[reg, per, mdl] for reg in region_btt]].sel(si=salib, param=params)
+            for shift, metric in zip([-small_shift, small_shift], output_btt):
+                stacked_barh(ax, y_pos+shift, sens.sel(metric=metric).values, bar_height,
+                             colors, hatches)
+            if ax == axes[idx][0]:
+                ax.set_ylabel(f'{per}')
+    for ax, label in zip(axes[0], MODEL_LABELS):
+        ax.set_title(label)
+
+    for ax in axes[1]:
+        ax.set_xlabel(salib)
+
+    axes[0,0].annotate('EAD', xy=(label_x, 3.05), fontsize=label_fontsize)
+    axes[0,0].annotate('RP 100', xy=(label_x, 2.75), fontsize=label_fontsize)
+
+    # Adding subfigure labels
+    labels = ['A', 'B', 'C', 'D', 'E', 'F', '', 'G']
+    for i, ax in enumerate(axes.ravel()):
+        ax.text(-0.1, 1.05, labels[i], transform=ax.transAxes, fontsize=9, fontweight='bold')
+
+    plt.setp(axes[0,0], yticks=range(len(regions)), yticklabels=region_btt)
+    plt.setp(axes[1,0], yticks=range(len(regions)), yticklabels=region_btt)
+
+    # Legend
+    handles = [plt.Rectangle((0,0), 1, 1, color='none') for _ in colors]
+    hmap = {handle: SingleColorHandler(color, hatch=hatch) for handle, color, hatch
+            in zip(handles, colors, hatches)}
+    fig.legend(handles=handles, labels=[PARAM_LABELS[param] for param in params],
+               handler_map=hmap, ncol=4, loc='lower center', bbox_to_anchor=(0.5, -0.05),
+               fancybox=False, shadow=False, fontsize=6.5)
+    if file is not None:
+        plt.savefig(file, dpi=300, facecolor='w', edgecolor='w', orientation='portrait',
+                    format='png', bbox_inches='tight', pad_inches=0.1)
+
+def drivers_table(regions, models, periods, samples_dict):
+    """
+    Risk changes of all samples of the main, cc and soc runs in one long table.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns region, source (model), delta ('total', 'CC', 'SOC' and 'sum',
+        the sum of the CC and SOC changes of a sample), year, sample, EAD and rp100.
+    """
+    # STORM has no 2090 runs, its 2050 results are used for both periods
+    runs = pd.DataFrame([(reg, mdl, delta, per, 2050 if mdl == 'STORM' else per, samples_dict[mdl])
+                         for reg in regions for mdl in models for delta in DELTA_NAMES
+                         for per in periods],
+                        columns=['region', 'model', 'delta', 'year', 'run_year', 'n_samples'])
+    delta_df = metrics_long(runs).drop(columns=['run_year', 'n_samples'])
+    delta_df = delta_df.rename(columns={'model': 'source', 'aai_agg': 'EAD'})
+    delta_df['delta'] = delta_df['delta'].map(DELTA_NAMES)
+
+    # sum of the CC and SOC changes, added sample by sample
+    keys = ['region', 'source', 'year', 'sample']
+    df_cc = delta_df[delta_df.delta == 'CC'].set_index(keys)[['EAD', 'rp100']]
+    df_soc = delta_df[delta_df.delta == 'SOC'].set_index(keys)[['EAD', 'rp100']]
+    df_sum = (df_cc + df_soc).reset_index().assign(delta='sum')
+    return pd.concat([delta_df, df_sum], ignore_index=True)
+
+def plot_drivers_figure(delta_df, metric, dlts, regions, years=(2050, 2090), file=None):
+    """
+    Figure 1 (EAD) and Supplementary Figure 1 (rp100): boxplots of the risk
+    change drivers dlts of all models.
+
+    Parameters
+    ----------
+    delta_df : pd.DataFrame
+        Long table of uncout_drivers.py, with columns region, source, year, delta
+        and metric.
+    metric : str
+        'EAD' or 'rp100'.
+    dlts : list of str
+        Drivers, out of 'CC', 'SOC', 'sum' and 'total'.
+    regions : list of str
+        Regions, one column each.
+    years : list of int, optional
+        Periods, one row each. Default: (2050, 2090)
+    file : Path, optional
+        Save the figure to file.
+    """
+    fig, ax = plt.subplots(ncols=4, nrows=2, figsize=(7.25, 3.6), sharex=True, sharey='row')
+    labels = iter('ABCDEFGH')
+    custom_colors = list(MODEL_COLORS.values())
+
+    for c, reg in enumerate(regions):
+        combined_df = delta_df[delta_df.region == reg].copy()
+        # STORM has no 2090 runs
+        combined_df.loc[(combined_df['source'] == 'STORM') & (combined_df['year'] == 2090), metric] = float('nan')
+
+        for r, year in enumerate(years):
+            year_df = combined_df[combined_df['year'] == year]
+            sns.boxplot(data=year_df, x="delta", hue="source", y=metric, width=0.4, palette=custom_colors,
+                        order=dlts, hue_order=list(MODEL_COLORS), showfliers=False, ax=ax[r, c], dodge=True)
+
+            ax[r, c].get_legend().remove()
+            sns.despine(ax=ax[r, c])
+            ax[r, c].set(xlabel="", ylabel="")
+            if c == 0:
+                ax[r, c].set(ylabel=f"\u0394 {metric} (%)")
+                ax[r, c].text(-0.5, 0.5, f"{year}", transform=ax[r, c].transAxes, ha='center', va='center')
+            if r == 0:
+                ax[r, c].set_title(f"{reg}")
+            ax[r, c].axhline(0, ls='dotted', color='k')
+            ax[r, c].text(-0.15, 1.05, next(labels), transform=ax[r, c].transAxes, fontsize=9, fontweight='bold')
+
+    handles = [mpatches.Patch(color=color, label=mdl) for mdl, color in MODEL_COLORS.items()]
+    fig.legend(handles=handles, loc='center right', bbox_to_anchor=(1.02, 0.5), fontsize=6.5)
+    if file is not None:
+        plt.savefig(file, dpi=300, facecolor='w', edgecolor='w', orientation='portrait',
+                    format='png', bbox_inches='tight', pad_inches=0.1)
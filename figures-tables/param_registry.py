@@ -0,0 +1,48 @@
+"""
+Created on 2026-10-19
+
+description: Registry of the uncertainty parameters of the UA_SA scripts. Every
+             parameter has a canonical name and a stable integer id (its position
+             in PARAMS; new parameters are appended). Names used in older UA
+             outputs are mapped to the canonical names, so that the results
+             catalog stores all runs with the same parameter names and ids.
+
+@author: simonameiler
+"""
+
+import numpy as np
+
+# canonical names, in the order of the sensitivity figures; the id is the position
+PARAMS = ['mn_exp', 'ssp_exp', 'gdp_model', 'HE_fut', 'HE_base', 'tcgi_var',
+          'ssp_haz', 'gc_model', 'wind_model', 'v_half']
+PARAM_ID = {param: i_param for i_param, param in enumerate(PARAMS)}
+
+# names of older UA outputs
+LEGACY_NAMES = {'rcp': 'ssp_haz',
+                'ensemble_fut': 'HE_fut',
+                'ensemble_pres': 'HE_base'}
+
+PARAM_LABELS = {'mn_exp': 'Exposure urban/rural weighting',
+                'ssp_exp': 'SSP exposures',
+                'gdp_model': 'GDP model',
+                'HE_fut': 'Event subsampling future',
+                'HE_base': 'Event subsampling base',
+                'tcgi_var': 'TCGI moisture variable',
+                'ssp_haz': 'SSP hazard',
+                'gc_model': 'GCM',
+                'wind_model': 'Wind model',
+                'v_half': 'Vulnerability function midpoint'}
+
+###########################################################################
+
+def canonical_names(names):
+    """ Canonical names of parameter names; raises a ValueError for unknown names """
+    names = [LEGACY_NAMES.get(name, name) for name in names]
+    unknown = set(names) - set(PARAMS)
+    if unknown:
+        raise ValueError(f'Parameters not in the registry: {sorted(unknown)}')
+    return names
+
+def param_ids(names):
+    """ Integer ids of parameter names (canonical or legacy) """
+    return np.array([PARAM_ID[name] for name in canonical_names(names)], dtype=int)
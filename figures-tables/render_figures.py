@@ -0,0 +1,113 @@
+"""
+Created on 2026-10-19
+
+description: Render the figures of the paper in one run: Figure 2 and Supplementary
+             Figure 2 (EAD and rp100 densities) with Supplementary Table 1, Figure 3
+             and Supplementary Figures 3-5 (S1 and ST, relative and absolute
+             changes) and Figure 1 and Supplementary Figure 1 (EAD and rp100
+             drivers). The results are read once from the results catalog and the
+             kernel densities of all panels are computed on worker processes.
+
+             python render_figures.py [max_workers]
+
+@author: simonameiler
+"""
+
+import sys
+import logging
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+#Load Climada modules
+from climada.util.constants import SYSTEM_DIR
+
+from sensitivity_summary import sensitivity_array
+from uncout_loader import report_cache_stats
+from figure_panels import (PAPER_RC, drivers_table, plot_drivers_figure, plot_sa_figure,
+                           plot_ua_figure, ua_output_dfs, ua_panels)
+
+LOGGER = logging.getLogger(__name__)
+
+res_dir = SYSTEM_DIR/"results"
+
+region = ['AP', 'IO', 'SH', 'WP']
+period = [2050, 2090]
+model = ['MIT', 'CHAZ', 'STORM', 'IBTrACS']
+samples_dict = {'MIT': 2**10,
+                'STORM': 2**10,
+                'IBTrACS': 2**10,
+                'CHAZ': 2**10}
+
+METRICS = ['EAD', 'rp100']
+SALIB = ['S1', 'ST']
+# parameters, colors and labels of the SA figures of the relative (main) and
+# absolute (abs) changes, as in uncout_SA.py and uncout_SA_abs.py
+SA_FIGURES = {
+    'main': {'params': ['mn_exp', 'ssp_exp', 'gdp_model', 'HE_fut', 'HE_base', 'tcgi_var',
+                        'ssp_haz', 'gc_model', 'wind_model', 'v_half'],
+             'colors': ['#a6cee3','#1f78b4','#b2df8a','#33a02c','#fb9a99','#e31a1c',
+                        '#fdbf6f','#ff7f00','#cab2d6','#6a3d9a'],
+             'hatch_patterns': {'#33a02c': '///', '#fb9a99': '///'},
+             'label_x': 0.5, 'label_fontsize': 6.5, 'suffix': ''},
+    'abs': {'params': ['mn_exp', 'ssp_exp', 'gdp_model', 'HE_fut', 'tcgi_var',
+                       'ssp_haz', 'gc_model', 'wind_model', 'v_half'],
+            'colors': ['#a6cee3','#1f78b4','#b2df8a','#33a02c','#e31a1c',
+                       '#fdbf6f','#ff7f00','#cab2d6','#6a3d9a'],
+            'hatch_patterns': {'#33a02c': '///'},
+            'label_x': 0.3, 'label_fontsize': 7, 'suffix': '_abs'}
+    }
+
+###########################################################################
+
+def render_ua(max_workers=None):
+    """ Figure 2, Supplementary Figure 2 and Supplementary Table 1 """
+    output_dfs = ua_output_dfs(period, region, model, samples_dict)
+    panels = ua_panels(output_dfs, METRICS, period, region, model, max_workers)
+    for mtrc in METRICS:
+        max_density_table = plot_ua_figure(panels, mtrc, period, region,
+                                           file=res_dir.joinpath(f"UA_all-models_{mtrc}.png"))
+        max_density_table.to_csv(res_dir.joinpath(f'max_density_points_{mtrc}.csv'), index=False)
+        plt.close('all')
+
+def render_sa():
+    """ Figure 3 and Supplementary Figures 3-5 """
+    # STORM has no 2090 runs, its 2050 results are used for both periods
+    runs = pd.DataFrame([(reg, per, mdl, 2050 if mdl == 'STORM' else per, samples_dict[mdl])
+                         for reg in region for per in period for mdl in model],
+                        columns=['region', 'year', 'model', 'run_year', 'n_samples'])
+    run_idx = {(reg, per, mdl): i for i, (reg, per, mdl)
+               in enumerate(zip(runs.region, runs.year, runs.model))}
+    with plt.rc_context({**PAPER_RC, 'lines.linewidth': 0.28}):
+        for delta, fig_args in SA_FIGURES.items():
+            si_arr = sensitivity_array(runs.assign(delta=delta))
+            for salib in SALIB:
+                plot_sa_figure(si_arr, run_idx, salib, fig_args['params'], fig_args['colors'],
+                               fig_args['hatch_patterns'], region, periods=period,
+                               label_x=fig_args['label_x'], label_fontsize=fig_args['label_fontsize'],
+                               file=res_dir.joinpath(f"SA_all-models_{salib}{fig_args['suffix']}.png"))
+                plt.close('all')
+
+def render_drivers():
+    """ Figure 1 and Supplementary Figure 1 """
+    delta_df = drivers_table(region, model, period, samples_dict)
+    with plt.rc_context({**PAPER_RC, 'lines.linewidth': 0.75}):
+        for metric in METRICS:
+            plot_drivers_figure(delta_df, metric, ["CC", "SOC"], region,
+                                file=res_dir.joinpath(f"delta_CC-SOC_{metric}.png"))
+            plt.close('all')
+
+def main(max_workers=None):
+    logging.basicConfig(level=logging.INFO)
+    max_workers = None if max_workers is None else int(max_workers)
+    LOGGER.info('Rendering the UA figures')
+    render_ua(max_workers)
+    LOGGER.info('Rendering the SA figures')
+    render_sa()
+    LOGGER.info('Rendering the drivers figures')
+    render_drivers()
+    report_cache_stats()
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
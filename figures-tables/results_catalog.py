@@ -0,0 +1,272 @@
+"""
+Created on 2026-10-19
+
+description: Catalog of the uncertainty and sensitivity analysis results. The
+             metrics (aai_agg and the return period impacts), the sensitivity
+             indices and the samples of every unsequa_TC_*.hdf5 file are stored in
+             one HDF5 file (pandas HDFStore, one table per run and kind), indexed
+             by model, region, year, delta (main, cc, soc, abs) and number of
+             samples. Runs are added incrementally: only files that are new or
+             changed since the last update are read. The figure scripts read the
+             tables they need instead of loading whole UncOutput objects.
+             Parameters are stored with the canonical names and integer ids of
+             param_registry, whatever names the UA output used.
+
+             Update the catalog after UA runs finished: python results_catalog.py
+
+@author: simonameiler
+"""
+
+import re
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+#Load Climada modules
+from climada.util.constants import SYSTEM_DIR
+from climada.engine.unsequa import UncOutput
+
+from uncout_loader import cached_read
+from param_registry import LEGACY_NAMES, canonical_names, param_ids
+
+LOGGER = logging.getLogger(__name__)
+
+unsequa_dir = SYSTEM_DIR/"unsequa"
+CATALOG_FILE = unsequa_dir/"results_catalog.h5"
+
+N_SAMPLES = 2**10
+# file name suffix of the runs used in the analysis
+MODEL_SUFFIX = {'MIT': '',
+                'CHAZ': '',
+                'STORM': '_v3',
+                'IBTrACS': '_v3'}
+# sensitivity indices stored per run
+SALIB_SI = ['S1', 'S1_conf', 'ST', 'ST_conf']
+# (ssp_haz, ssp_exp) sample values of the same SSP: SSP2-4.5, SSP3-7.0, SSP5-8.5
+SSP_PAIRS = [(1.0, 2.0), (2.0, 3.0), (3.0, 5.0)]
+
+UNSEQUA_PATTERN = re.compile(
+    r"unsequa_TC_(?P<year>\d{4})_(?P<region>[A-Z]{2})_0(?P<res>\d+)as_"
+    r"(?P<model>[A-Za-z]+)_(?P<n_samples>\d+)_(?P<delta>[a-z]+)(?P<suffix>(_v\d+)?)\.hdf5$")
+INDEX_COLS = ['model', 'region', 'year', 'delta', 'n_samples']
+# runs stored with an older layout of the tables are read again
+CATALOG_VERSION = 2
+
+###########################################################################
+
+def run_key(model, region, year, delta, n_samples=N_SAMPLES):
+    """ Name of the tables of a run in the catalog """
+    return f"{model}_{region}_{year}_{delta}_{n_samples}"
+
+def unsequa_file(model, region, year, delta, n_samples=N_SAMPLES, res=300):
+    """ Path of the UncOutput file of a run """
+    return unsequa_dir.joinpath(
+        f"unsequa_TC_{year}_{region}_0{res}as_{model}_{n_samples}_{delta}{MODEL_SUFFIX[model]}.hdf5")
+
+def parse_unsequa_file(file):
+    """ Index values of an UncOutput file, None if not a run used in the analysis """
+    match = UNSEQUA_PATTERN.match(Path(file).name)
+    if match is None or MODEL_SUFFIX.get(match['model']) != match['suffix']:
+        return None
+    return {'model': match['model'], 'region': match['region'], 'year': int(match['year']),
+            'delta': match['delta'], 'n_samples': int(match['n_samples'])}
+
+def load_index(catalog_file=CATALOG_FILE):
+    """ Table of all runs in the catalog with their file and its mtime """
+    try:
+        index = pd.read_hdf(catalog_file, 'runs')
+    except (FileNotFoundError, KeyError):
+        return pd.DataFrame(columns=INDEX_COLS + ['key', 'file', 'mtime', 'version'])
+    if 'version' not in index:
+        index['version'] = 1
+    return index
+
+def _run_tables(output_imp):
+    """ Metrics, sensitivity and samples tables of an UncOutput """
+    metrics = pd.concat([output_imp.aai_agg_unc_df, output_imp.freq_curve_unc_df], axis=1)
+    sens = pd.concat([output_imp.get_sensitivity(salib_si).assign(si=salib_si)
+                      for salib_si in SALIB_SI], ignore_index=True)
+    # second parameter of second-order indices, None for S1 and ST
+    sens['param2'] = sens['param2'].fillna('').astype(str)
+    sens['param'] = canonical_names(sens['param'])
+    sens['param_id'] = param_ids(sens['param'])
+    samples = output_imp.samples_df.rename(columns=LEGACY_NAMES)
+    return {'metrics': metrics, 'sensitivity': sens, 'samples': samples}
+
+def update_catalog(files=None, catalog_file=CATALOG_FILE):
+    """
+    Add new and changed UncOutput files to the catalog.
+
+    Parameters
+    ----------
+    files : list of Path, optional
+        UncOutput files. Default: all unsequa_TC_*.hdf5 files in unsequa_dir
+    catalog_file : Path, optional
+        Catalog file. Default: CATALOG_FILE
+
+    Returns
+    -------
+    int
+        Number of runs added or updated.
+    """
+    if files is None:
+        files = sorted(unsequa_dir.glob('unsequa_TC_*.hdf5'))
+    index = load_index(catalog_file).set_index('key')
+    n_new = 0
+    with pd.HDFStore(catalog_file, mode='a') as store:
+        for file in files:
+            run = parse_unsequa_file(file)
+            if run is None:
+                continue
+            key = run_key(**run)
+            mtime = Path(file).stat().st_mtime
+            if key in index.index and index.at[key, 'mtime'] == mtime \
+                    and index.at[key, 'version'] == CATALOG_VERSION:
+                continue
+            LOGGER.info('Adding %s to the catalog', file)
+            # read without the cache of uncout_loader: each file is needed once
+            # here and a full UncOutput per run would stay in memory
+            for kind, table in _run_tables(UncOutput.from_hdf5(file)).items():
+                store.put(f"{kind}/{key}", table, format='table')
+            index.loc[key, INDEX_COLS + ['file', 'mtime', 'version']] = \
+                list(run.values()) + [str(file), mtime, CATALOG_VERSION]
+            n_new += 1
+        if n_new:
+            store.put('runs', index.reset_index().astype(
+                {'year': int, 'n_samples': int, 'mtime': float, 'version': int}), format='table')
+    return n_new
+
+def _read_table(catalog_file, key, columns):
+    return pd.read_hdf(catalog_file, key, columns=None if columns is None else list(columns))
+
+def _read(kind, model, region, year, delta, n_samples=N_SAMPLES, columns=None,
+          catalog_file=CATALOG_FILE):
+    """ Table of a run, read once per process; a copy is returned """
+    columns = None if columns is None else tuple(columns)
+    return cached_read(catalog_file, _read_table,
+                       f"{kind}/{run_key(model, region, year, delta, n_samples)}",
+                       columns).copy()
+
+def load_metrics(model, region, year, delta, n_samples=N_SAMPLES, columns=None,
+                 catalog_file=CATALOG_FILE):
+    """
+    Metric values of every sample of a run, e.g. columns=['aai_agg', 'rp100'].
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns aai_agg and the return periods of the frequency curve (or columns).
+    """
+    return _read('metrics', model, region, year, delta, n_samples, columns, catalog_file)
+
+def metrics_long(runs, columns=('aai_agg', 'rp100'), catalog_file=CATALOG_FILE):
+    """
+    Metric values of all samples of many runs in one long table.
+
+    Parameters
+    ----------
+    runs : pd.DataFrame
+        One row per run with columns model, region, year and delta, and optionally
+        n_samples (default N_SAMPLES) and run_year, the year of the run in the
+        catalog if it differs from year (e.g. STORM 2050 results used for 2090).
+    columns : list of str, optional
+        Metrics. Default: ('aai_agg', 'rp100')
+    catalog_file : Path, optional
+        Results catalog. Default: CATALOG_FILE
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per run and sample: the columns of runs, the position of the
+        sample in its run ('sample') and the metrics.
+    """
+    runs = runs.reset_index(drop=True)
+    tables = [load_metrics(run.model, run.region, run.get('run_year', run.year), run.delta,
+                           run.get('n_samples', N_SAMPLES), columns, catalog_file)
+              for _, run in runs.iterrows()]
+    sizes = np.array([len(table) for table in tables])
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+
+    values = np.empty((offsets[-1], len(columns)))
+    for table, start, end in zip(tables, offsets[:-1], offsets[1:]):
+        values[start:end] = table[list(columns)].to_numpy(dtype=float)
+    long_df = runs.iloc[np.repeat(runs.index, sizes)].reset_index(drop=True)
+    long_df['sample'] = np.arange(offsets[-1]) - np.repeat(offsets[:-1], sizes)
+    return pd.concat([long_df, pd.DataFrame(values, columns=list(columns))], axis=1)
+
+def _ssp_consistent(samples):
+    """ Samples with the same SSP for hazard and exposure """
+    return np.logical_or.reduce([(samples.ssp_haz == haz) & (samples.ssp_exp == exp)
+                                 for haz, exp in SSP_PAIRS])
+
+# named boolean filters of the samples, computed from samples_df
+SAMPLE_FILTERS = {'ssp_consistent': _ssp_consistent}
+
+def load_aligned(model, regions, years, delta='main', n_samples=N_SAMPLES,
+                 columns=('aai_agg', 'rp100'), filters=(), catalog_file=CATALOG_FILE):
+    """
+    Samples and metric values of the runs of a model as one frame, aligned by sample.
+
+    The samples of all runs of a model are the same, they are read from the
+    first run. The filters are computed once from them and hold for all runs.
+
+    Parameters
+    ----------
+    model : str
+        Hazard model.
+    regions : list of str
+        Regions.
+    years : list of int
+        Years.
+    delta : str, optional
+        Delta of the runs. Default: 'main'
+    n_samples : int, optional
+        Number of samples. Default: N_SAMPLES
+    columns : list of str, optional
+        Metrics. Default: ('aai_agg', 'rp100')
+    filters : list of str, optional
+        Names of SAMPLE_FILTERS, added as boolean columns.
+    catalog_file : Path, optional
+        Results catalog. Default: CATALOG_FILE
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns of samples_df, '{region}_{year}_{metric}' for every run and metric
+        and one column per filter.
+    """
+    samples = load_samples(model, regions[0], years[0], delta, n_samples, catalog_file=catalog_file)
+    frames = [samples]
+    for reg in regions:
+        for year in years:
+            metrics = load_metrics(model, reg, year, delta, n_samples, columns, catalog_file)
+            if len(metrics) != len(samples):
+                raise ValueError(f'{run_key(model, reg, year, delta, n_samples)} has {len(metrics)} '
+                                 f'results for {len(samples)} samples')
+            frames.append(metrics[list(columns)].set_axis(
+                [f'{reg}_{year}_{col}' for col in columns], axis=1).set_index(samples.index))
+    frames.append(pd.DataFrame({name: SAMPLE_FILTERS[name](samples) for name in filters},
+                               index=samples.index))
+    return pd.concat(frames, axis=1, copy=False)
+
+def load_sensitivity_all(model, region, year, delta, n_samples=N_SAMPLES,
+                         catalog_file=CATALOG_FILE):
+    """ Sensitivity indices SALIB_SI of a run, distinguished by column si """
+    return _read('sensitivity', model, region, year, delta, n_samples,
+                 catalog_file=catalog_file)
+
+def load_sensitivity(model, region, year, delta, salib_si='S1', n_samples=N_SAMPLES,
+                     catalog_file=CATALOG_FILE):
+    """ Sensitivity indices of a run as returned by UncOutput.get_sensitivity(salib_si) """
+    sens = load_sensitivity_all(model, region, year, delta, n_samples, catalog_file)
+    return sens[sens.si == salib_si].reset_index(drop=True)
+
+def load_samples(model, region, year, delta, n_samples=N_SAMPLES, columns=None,
+                 catalog_file=CATALOG_FILE):
+    """ Samples of the uncertainty parameters of a run (UncOutput.samples_df) """
+    return _read('samples', model, region, year, delta, n_samples, columns, catalog_file)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    LOGGER.info('%s runs added or updated', update_catalog())
@@ -0,0 +1,114 @@
+"""
+Created on 2026-10-19
+
+description: Sensitivity indices of many runs as one array. The S1, ST and
+             confidence values of all runs in the results catalog are stacked into
+             a 4-D array (run x parameter x metric x index), with the parameters
+             placed by their registry id (param_registry), from which the largest
+             indices of every run and metric are taken in one vectorized call.
+             Tables are exported to Excel, csv or parquet.
+
+@author: simonameiler
+"""
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from results_catalog import CATALOG_FILE, N_SAMPLES, SALIB_SI, load_sensitivity_all
+from param_registry import PARAMS
+
+###########################################################################
+
+def sensitivity_array(runs, salib_si=SALIB_SI, catalog_file=CATALOG_FILE):
+    """
+    Stack the sensitivity indices of runs.
+
+    Parameters
+    ----------
+    runs : pd.DataFrame
+        One row per run with columns model, region, year and delta, and optionally
+        n_samples (default N_SAMPLES) and run_year, the year of the run in the
+        catalog if it differs from year (e.g. STORM 2050 results used for 2090).
+    salib_si : list of str, optional
+        Sensitivity indices. Default: SALIB_SI
+    catalog_file : Path, optional
+        Results catalog. Default: CATALOG_FILE
+
+    Returns
+    -------
+    xr.DataArray
+        Dimensions run, param (all parameters of the registry, in id order),
+        metric and si; the columns of runs are coordinates of the run dimension.
+        Parameters missing in a run are NaN.
+    """
+    runs = runs.reset_index(drop=True)
+    frames = []
+    for _, run in runs.iterrows():
+        sens = load_sensitivity_all(
+            run.model, run.region, run.get('run_year', run.year), run.delta,
+            run.get('n_samples', N_SAMPLES), catalog_file=catalog_file)
+        frames.append(sens[sens.si.isin(salib_si)])
+    metrics = frames[0].select_dtypes(include=np.number).columns.drop('param_id')
+    si_idx = pd.Index(salib_si)
+
+    values = np.full((len(frames), len(PARAMS), metrics.size, si_idx.size), np.nan)
+    for i_run, sens in enumerate(frames):
+        values[i_run, sens.param_id.to_numpy(), :, si_idx.get_indexer(sens.si)] = \
+            sens[metrics].to_numpy(dtype=float)
+    return xr.DataArray(
+        values, dims=('run', 'param', 'metric', 'si'),
+        coords={'run': runs.index, 'param': PARAMS, 'metric': metrics, 'si': si_idx,
+                **{col: ('run', runs[col].to_numpy()) for col in runs.columns}})
+
+def largest_si_batch(si_array, salib_si=('S1', 'ST'), top_k=1, threshold=0.01):
+    """
+    Parameters with the top_k largest indices for every run, metric and index.
+
+    Parameters
+    ----------
+    si_array : xr.DataArray
+        Output of sensitivity_array.
+    salib_si : list of str, optional
+        Sensitivity indices to rank. Default: ('S1', 'ST')
+    top_k : int, optional
+        Number of parameters per run, metric and index. Default: 1
+    threshold : float, optional
+        Indices below are not attributed to a parameter (param is None), as in
+        UncOutput.get_largest_si. Default: 0.01
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per run, index, metric and rank (0 for the largest), ordered so,
+        with the run coordinates and columns si, metric, rank, param and value.
+    """
+    vals = si_array.sel(si=list(salib_si)).transpose('run', 'si', 'metric', 'param').values
+    order = np.argsort(-np.nan_to_num(vals, nan=-np.inf), axis=-1, kind='stable')[..., :top_k]
+    top = np.take_along_axis(vals, order, axis=-1)
+    param = si_array.param.values[order].astype(object)
+    param[~(top >= threshold)] = None
+
+    n_run, n_si, n_metric = vals.shape[:3]
+    idx_run, idx_si, idx_metric, rank = np.indices((n_run, n_si, n_metric, top_k)).reshape(4, -1)
+    run_coords = {name: coord.values[idx_run] for name, coord in si_array.coords.items()
+                  if coord.dims == ('run',) and name != 'run'}
+    return pd.DataFrame({**run_coords,
+                         'si': np.asarray(salib_si)[idx_si],
+                         'metric': si_array.metric.values[idx_metric],
+                         'rank': rank,
+                         'param': param.ravel(),
+                         'value': top.ravel()})
+
+def export_table(df, file, **kwargs):
+    """ Write df to Excel (.xlsx), csv (.csv) or parquet (.parquet, requires pyarrow) """
+    suffix = Path(file).suffix
+    if suffix == '.xlsx':
+        df.to_excel(file, index=False, **kwargs)
+    elif suffix == '.csv':
+        df.to_csv(file, index=False, **kwargs)
+    elif suffix == '.parquet':
+        df.to_parquet(file, index=False, **kwargs)
+    else:
+        raise ValueError(f'Unknown table format: {suffix}')
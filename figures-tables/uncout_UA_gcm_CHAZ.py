@@ -3,14 +3,13 @@ Adapted for code repository on 2024-02-26
 
 description: Supplementary Figure 6 - plotting of TC risk change (EAD) for each GCM from CHAZ
              Supplementary Figure 7 - plotting of TC risk change (rp100) for each GCM from CHAZ
-             line 70: change metric="EAD" to "rp100"
+             line 57: change metric="EAD" to "rp100"
 
             
 @author: simonameiler
 """
 
 import numpy as np
-import copy as cp
 import logging
 import seaborn as sns
 import matplotlib.pyplot as plt
@@ -18,7 +17,8 @@ from matplotlib.lines import Line2D
 
 #Load Climada modules
 from climada.util.constants import SYSTEM_DIR # loads default directory paths for data
-from climada.engine.unsequa import UncOutput
+
+from results_catalog import load_aligned
 
     
 LOGGER = logging.getLogger(__name__)
@@ -28,7 +28,6 @@ LOGGER = logging.getLogger(__name__)
 ###########################################################################
 
 # define paths
-unsequa_dir = SYSTEM_DIR/"unsequa"
 res_dir = SYSTEM_DIR/"results"
 
 res = 300
@@ -37,34 +36,12 @@ region = ['AP', 'IO', 'SH', 'WP']
 period = [2050, 2090]
 N_samples = 2**10
 
-# make dictionary of unsequa output
-output_dict= {}
-for reg in region:
-    for per in period:
-        unsequa_str = f"unsequa_TC_{per}_{reg}_0{res}as_CHAZ_{N_samples}_main.hdf5"
-        output_imp = UncOutput.from_hdf5(unsequa_dir.joinpath(unsequa_str))
-        output_dict[str(reg)+'_'+str(per)] = output_imp
-
-# make dataframe of all results over regions and periods
-# samples_df is identical for all UncOutput objects in the output_dict
-# idea: extend the samples_df with the results of interest
-# first, get indexes where hazard and exposure SSPs match
-ssp245_idx = (output_imp.samples_df.ssp_haz == 1.0) & (output_imp.samples_df.ssp_exp == 2.0)
-ssp370_idx = (output_imp.samples_df.ssp_haz == 2.0) & (output_imp.samples_df.ssp_exp == 3.0)
-ssp585_idx = (output_imp.samples_df.ssp_haz == 3.0) & (output_imp.samples_df.ssp_exp == 5.0)
-ssp_idx = ssp245_idx + ssp370_idx + ssp585_idx
-
-output_df = cp.deepcopy(output_imp.samples_df)
-for reg in region:
-    for per in period:
-        output_df[str(reg)+'_'+str(per)+'_EAD_unc'] = output_dict[
-            str(reg)+'_'+str(per)].aai_agg_unc_df
-        output_df[str(reg)+'_'+str(per)+'_rp100_unc'] = output_dict[
-            str(reg)+'_'+str(per)].freq_curve_unc_df.rp100
-        output_df[str(reg)+'_'+str(per)+'_EAD_ssp_unc'] = output_dict[
-            str(reg)+'_'+str(per)].aai_agg_unc_df[ssp_idx]
-        output_df[str(reg)+'_'+str(per)+'_rp100_ssp_unc'] = output_dict[
-            str(reg)+'_'+str(per)].freq_curve_unc_df.rp100[ssp_idx]
+# samples and metrics of all regions and periods from the results catalog, aligned
+# by sample; samples_df is identical for all UncOutput objects. The ssp_consistent
+# column marks the samples where hazard and exposure SSPs match.
+output_df = load_aligned('CHAZ', region, period, 'main', N_samples,
+                         columns=['aai_agg', 'rp100'], filters=['ssp_consistent'])
+output_df = output_df.rename(columns=lambda col: col.replace('aai_agg', 'EAD'))
 
 #%%
 plt.rcParams.update({
@@ -98,8 +75,8 @@ TCR_CHAZ = {1.0: 2.0,
 models_TCR = [2.0, 2.22, 2.30, 2.35, 1.55, 2.77]
 models_srtd = ['miroc6', 'cesm2', 'cnrm6', 'ecearth', 'ipsl6', 'ukmo6']
 
-output_df.gc_model.replace(TCR_CHAZ, inplace=True)
-output_df.sort_values('gc_model', inplace=True)
+output_df['gc_model'] = output_df['gc_model'].replace(TCR_CHAZ)
+output_df = output_df.sort_values('gc_model')
 
 # options for secondary y-axis plots - sort TCR values
 TCR_list = list(TCR_CHAZ.values())
@@ -120,7 +97,7 @@ customPalette_d = sns.hls_palette(n_colors=2, l=0.4, s=1.)
 for r, reg in enumerate(region):
     for p, per in enumerate(period):
         sns.stripplot(
-            data=output_df, x="gc_model", y=f"{reg}_{per}_{metric}_unc", hue="tcgi_var",
+            data=output_df, x="gc_model", y=f"{reg}_{per}_{metric}", hue="tcgi_var",
             marker=".", dodge=True, alpha=.75, zorder=1, legend=True, palette=customPalette_d,
             ax=ax[r,p])
 
@@ -11,14 +11,15 @@ description: Figure 2 - plotting kernel density distribution EAD
 import numpy as np
 import seaborn as sns
 import matplotlib.pyplot as plt
-from scipy.stats import gaussian_kde
 import pandas as pd
-from climada.engine.unsequa import UncOutput
 from climada.util.constants import SYSTEM_DIR
 import matplotlib.patches as patches
+
+from results_catalog import load_metrics
+from kde_grid import plot_kdes
+from figure_panels import ua_panels
 from matplotlib.lines import Line2D
 
-unsequa_dir = SYSTEM_DIR/"unsequa"
 res_dir = SYSTEM_DIR/"results"
 
 res = 300
@@ -26,36 +27,25 @@ region = ['AP', 'IO', 'SH', 'WP']
 fut_year = 2050
 
 model = ['MIT', 'CHAZ', 'STORM', 'IBTrACS']
-end_dict = {'MIT': '_main',
-            'STORM': '_main_v3',
-            'IBTrACS': '_main_v3',
-            'CHAZ': '_main'}
 
 samples_dict = {'MIT': 2**10,
                 'STORM': 2**10,
                 'IBTrACS': 2**10,
                 'CHAZ': 2**10}
 
-def construct_output_df(year, models, regions, samples_dict, end_dict, res, unsequa_dir):
-    """Construct output dataframe for a given year."""
-    output_dict= {}
+def construct_output_df(year, models, regions, samples_dict):
+    """Construct output dataframe for a given year from the results catalog."""
+    output_df = pd.DataFrame()
     for reg in regions:
         for mdl in models:
             # Skip STORM for 2090
             if year == 2090 and mdl == "STORM":
                 continue
 
-            unsequa_str = f"unsequa_TC_{year}_{reg}_0{res}as_{mdl}_{samples_dict[mdl]}{end_dict[mdl]}.hdf5"
-            output_imp = UncOutput.from_hdf5(unsequa_dir.joinpath(unsequa_str))
-            output_dict[str(reg)+'_'+str(mdl)] = output_imp
-
-    output_df = pd.DataFrame()
-    for reg in regions:
-        for mdl in models:
-            # Check if the model-year combination is in the output_dict before accessing
-            if str(reg)+'_'+str(mdl) in output_dict:
-                output_df[str(reg)+'_'+str(mdl)+'_EAD_unc'] = output_dict[str(reg)+'_'+str(mdl)].aai_agg_unc_df
-                output_df[str(reg)+'_'+str(mdl)+'_rp100_unc'] = output_dict[str(reg)+'_'+str(mdl)].freq_curve_unc_df.rp100
+            metrics = load_metrics(mdl, reg, year, 'main', samples_dict[mdl],
+                                   columns=['aai_agg', 'rp100'])
+            output_df[str(reg)+'_'+str(mdl)+'_EAD_unc'] = metrics.aai_agg
+            output_df[str(reg)+'_'+str(mdl)+'_rp100_unc'] = metrics.rp100
             
     return output_df
 
@@ -64,7 +54,7 @@ def construct_output_df(year, models, regions, samples_dict, end_dict, res, unse
 years = [2050, 2090]
 output_dfs = {}
 for year in years:
-    output_dfs[year] = construct_output_df(year, model, region, samples_dict, end_dict, res, unsequa_dir)
+    output_dfs[year] = construct_output_df(year, model, region, samples_dict)
 
 color_dict = {
     'MIT': '#2b83ba',
@@ -89,18 +79,26 @@ plt.rcParams.update({
     'lines.linewidth': 0.28,   # Line weight
 })
 
+# kernel densities of every metric, period and region
+panels = ua_panels(output_dfs, ['EAD', 'rp100'], years, region, model)
+
 # Plotting
 for mtrc in ['EAD', 'rp100']:
     # Create a new figure for each metric
     fig, ax = plt.subplots(nrows=2, ncols=4, figsize=(7.25, 3.6), sharex=False, sharey=True)
     
-    # Max density table for each metric
-    max_density_table = pd.DataFrame(columns=['Year', 'Column', 'Region', 'Max Density Point'])
+    # Max density table for each metric, one row per year and available column
+    max_density_table = pd.DataFrame(
+        [(year, f'{reg}_{mdl}_{mtrc}_unc', reg) for year in years for reg in region for mdl in model
+         if f'{reg}_{mdl}_{mtrc}_unc' in output_dfs[year].columns],
+        columns=['Year', 'Column', 'Region'])
+    max_density_table['Max Density Point'] = np.nan
+    i_row = 0
     
     # Inner loop for each year
     for idx, year in enumerate([2050, 2090]):
         
-        output_df = construct_output_df(year, model, region, samples_dict, end_dict, res, unsequa_dir)
+        output_df = output_dfs[year]
         
         for r, reg in enumerate(region):
             cols = [f'{reg}_{mdl}_{mtrc}_unc' for mdl in model if f'{reg}_{mdl}_{mtrc}_unc' in output_df.columns]
@@ -108,8 +106,8 @@ for mtrc in ['EAD', 'rp100']:
             # Color palette based on available models
             custom_colors = [color_dict[mdl] for mdl in model if f'{reg}_{mdl}_{mtrc}_unc' in output_df.columns]
             
-            df_plot = output_df.loc[:, cols]
-            sns.kdeplot(df_plot, fill=False, legend=False, ax=ax[idx,r], palette=custom_colors, linewidth=1.0)
+            dens, points = panels[mtrc, year, reg]
+            plot_kdes(ax[idx,r], dens, custom_colors, fill=False, linewidth=1.0)
             
             sns.despine()
             ax[0,r].set_xlim(-3,10)
@@ -119,19 +117,8 @@ for mtrc in ['EAD', 'rp100']:
                           fontsize=9, fontweight='bold')
             #ax[:,r].get_legend().remove()
             
-            # Compute kernel density estimate
-            for col, color in zip(cols, custom_colors):
-                kde = gaussian_kde(df_plot[col].dropna())
-                x_vals = np.linspace(-3, 10, 1000)
-                y_vals = kde(x_vals)
-                
-                # Find the maximum density point
-                max_density_point = x_vals[np.argmax(y_vals)]
-                
-                # Append to the max_density_table for each metric
-                max_density_table = max_density_table.append({
-                    'Year': year, 'Column': col, 'Region': reg, 
-                    'Max Density Point': max_density_point}, ignore_index=True)
+            max_density_table.iloc[i_row:i_row+len(cols), 3] = points.to_numpy()
+            i_row += len(cols)
         
             ax[idx,1].set_xlabel(f'{mtrc} change {year} (%)')
         #ax[1,1].set_xlabel(f'{mtrc} change {year} (%)')
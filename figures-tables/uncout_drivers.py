@@ -3,7 +3,8 @@ Adapted for code repository on 2024-02-26
 
 description: Figure 1 - plotting of TC risk change drivers EAD
              Supplementary Figure 1 - plotting of TC risk change drivers rp100
-             line 102: change metric="EAD" to "rp100"
+             Figure 1 and Supplementary Figure 1 are saved in one run
+             line 122: change metric="EAD" to "rp100" for the boxplot statistics
              Saving values describing the boxplots of Figure 1, SI Fig. 1 in more detail.
             
 @author: simonameiler
@@ -17,7 +18,8 @@ import matplotlib.patches as mpatches
 
 #Load Climada modules
 from climada.util.constants import SYSTEM_DIR # loads default directory paths for data
-from climada.engine.unsequa import UncOutput
+
+from figure_panels import PAPER_RC, drivers_table, plot_drivers_figure
 
     
 LOGGER = logging.getLogger(__name__)
@@ -27,7 +29,6 @@ LOGGER = logging.getLogger(__name__)
 ###########################################################################
 
 # define paths
-unsequa_dir = SYSTEM_DIR/"unsequa"
 res_dir = SYSTEM_DIR/"results"
 
 res = 300
@@ -46,65 +47,16 @@ samples_dict = {'MIT': 2**10,
 
 model = ['MIT', 'CHAZ', 'STORM', 'IBTrACS']
 
-# make dictionary of unsequa output
-output_dict= {}
-for reg in region:
-    for delta in deltas:
-        for per in period:
-            for mdl in model:
-                if mdl == "IBTrACS":
-                    unsequa_str = f"unsequa_TC_{per}_{reg}_0{res}as_{mdl}_{samples_dict[mdl]}_{delta}_v3.hdf5"
-                    output_imp = UncOutput.from_hdf5(unsequa_dir.joinpath(unsequa_str))
-                    output_dict[str(reg)+'_'+str(per)+'_'+str(delta_dict[delta])+'_'+str(mdl)] = output_imp
-                elif mdl == 'STORM':
-                    unsequa_str = f"unsequa_TC_2050_{reg}_0{res}as_{mdl}_{samples_dict[mdl]}_{delta}_v3.hdf5"
-                    output_imp = UncOutput.from_hdf5(unsequa_dir.joinpath(unsequa_str))
-                    output_dict[str(reg)+'_'+str(per)+'_'+str(delta_dict[delta])+'_'+str(mdl)] = output_imp
-                else:
-                    unsequa_str = f"unsequa_TC_{per}_{reg}_0{res}as_{mdl}_{samples_dict[mdl]}_{delta}.hdf5"
-                    output_imp = UncOutput.from_hdf5(unsequa_dir.joinpath(unsequa_str))
-                    output_dict[str(reg)+'_'+str(per)+'_'+str(delta_dict[delta])+'_'+str(mdl)] = output_imp
-                    
 #%% prep dataframe 
 
-delta_df_dict = {}
-
-for reg in region:
-    delta_df_mdl = {}  # Initialize for each region
-    for mdl in model:
-        delta_df_list = []
-        for delta in deltas:
-            for per in period:
-                df = pd.DataFrame()
-                df['EAD'] = output_dict[str(reg)+'_'+str(per)+'_'+str(delta_dict[delta])+'_'+str(mdl)].aai_agg_unc_df
-                df['rp100'] = output_dict[str(reg)+'_'+str(per)+'_'+str(delta_dict[delta])+'_'+str(mdl)].freq_curve_unc_df.rp100
-                df['delta'] = delta_dict[delta]
-                df['year'] = per
-                delta_df_list.append(df)
-
-        delta_df = pd.concat(delta_df_list)
-        
-        # These operations should be outside the deltas and period loops but inside the model loop
-        df_cc = delta_df[delta_df.delta == 'CC']
-        df_soc = delta_df[delta_df.delta == 'SOC']
-        df_sum = df_cc + df_soc
-        df_sum.delta = 'sum'
-        df_sum.year[df_sum.year == 4100] = 2050
-        df_sum.year[df_sum.year == 4180] = 2090
-        delta_df = pd.concat([delta_df, df_sum])
-        
-        delta_df_mdl[mdl] = delta_df
-
-    delta_df_dict[reg] = delta_df_mdl
+# one row per sample of every region, model, delta and period, with the sum of
+# the CC and SOC changes of every sample
+delta_df = drivers_table(region, model, period, samples_dict)
 
 
 #%% plot 
 # metric = "EAD"
 
-# Function to concatenate dataframes with a new source column
-def concat_dfs(dfs, labels):
-    return pd.concat([df.assign(source=label) for df, label in zip(dfs, labels)], ignore_index=True)
-
 # # Updated to 2 columns
 # fig, ax = plt.subplots(ncols=2, nrows=4, figsize=(8,8), sharex=True, sharey=True)
 
@@ -113,9 +65,7 @@ def concat_dfs(dfs, labels):
 # custom_colors = ['#2b83ba', '#abdda4', '#fdae61', '#d7191c']
 
 # for r, reg in enumerate(['AP', 'IO', 'SH', 'WP']):
-#     dfs = [delta_df_dict[reg]['MIT'], delta_df_dict[reg]['CHAZ'], delta_df_dict[reg]['STORM'], delta_df_dict[reg]['IBTrACS']]
-#     data_labels = ['MIT', 'CHAZ', 'STORM', 'IBTrACS']
-#     combined_df = concat_dfs(dfs, data_labels)
+#     combined_df = delta_df[delta_df.region == reg].copy()
     
 #     # Set all values of the source "STORM" in the year 2090 to NaN
 #     combined_df.loc[(combined_df['source'] == 'STORM') & (combined_df['year'] == 2090), metric] = float('nan')
@@ -161,9 +111,8 @@ metric = "EAD"
 all_stats = []
 
 for r, reg in enumerate(['AP', 'IO', 'SH', 'WP']):
-    dfs = [delta_df_dict[reg]['MIT'], delta_df_dict[reg]['CHAZ'], delta_df_dict[reg]['STORM'], delta_df_dict[reg]['IBTrACS']]
     data_labels = ['MIT', 'CHAZ', 'STORM', 'IBTrACS']
-    combined_df = concat_dfs(dfs, data_labels)
+    combined_df = delta_df[delta_df.region == reg].copy()
 
     for c, year in enumerate([2050, 2090]):
         year_df = combined_df[combined_df['year'] == year]
@@ -202,74 +151,15 @@ stats_df.loc[(stats_df['model'] == 'STORM') & (stats_df['year'] == 2090), ['25%'
 
 #%%
 
-plt.rcParams.update({
-    'font.size': 8,            # Default font size
-    'axes.titlesize': 9,       # Font size for figure part labels (A, B, C, etc.)
-    'axes.labelsize': 8,       # Font size for axis labels
-    'xtick.labelsize': 6,      # Font size for x-tick labels
-    'ytick.labelsize': 6,      # Font size for y-tick labels
-    'legend.fontsize': 7.5,    # Font size for legend
-    'lines.linewidth': 0.75,   # Line weight
-})
-
-metric = "rp100"
+plt.rcParams.update({**PAPER_RC, 'lines.linewidth': 0.75})
+
 dlts = ["CC", "SOC"]
 naming_dict = {("CC", "SOC"): 'CC-SOC',
                ("sum", "total"): 'sum-total',
                ("CC", "SOC", "sum", "total"): 'all'}
 key = tuple(dlts)
 
-# Function to concatenate dataframes with a new source column
-def concat_dfs(dfs, labels):
-    return pd.concat([df.assign(source=label) for df, label in zip(dfs, labels)], ignore_index=True)
-
-# Updated to 4 columns and 2 rows
-fig, ax = plt.subplots(ncols=4, nrows=2, figsize=(7.25, 3.6), sharex=True, sharey='row')
-
-#labels = iter('abcdefgh')  # create an iterator for subplot labels
-labels = iter('ABCDEFGH')  # create an iterator for subplot labels
-custom_colors = ['#2b83ba', '#abdda4', '#fdae61', '#d7191c']
-
-for c, reg in enumerate(['AP', 'IO', 'SH', 'WP']):
-    dfs = [delta_df_dict[reg]['MIT'], delta_df_dict[reg]['CHAZ'], delta_df_dict[reg]['STORM'], delta_df_dict[reg]['IBTrACS']]
-    data_labels = ['MIT', 'CHAZ', 'STORM', 'IBTrACS']
-    combined_df = concat_dfs(dfs, data_labels)
-    
-    # Set all values of the source "STORM" in the year 2090 to NaN
-    combined_df.loc[(combined_df['source'] == 'STORM') & (combined_df['year'] == 2090), metric] = float('nan')
-    
-    for r, year in enumerate([2050, 2090]):
-        year_df = combined_df[combined_df['year'] == year]
-
-        # Filter for all deltas
-        all_deltas_df = year_df[year_df['delta'].isin(['CC', 'SOC', 'sum', 'total'])]
-        
-        # Plot all deltas
-        sns.boxplot(data=all_deltas_df, x="delta", hue="source", y=metric, width=0.4, palette=custom_colors,
-                    order=dlts, showfliers=False, ax=ax[r, c], dodge=True)
-        
-        ax[r, c].get_legend().remove()
-        sns.despine(ax=ax[r, c])
-        ax[r, c].set(xlabel="", ylabel="")
-        if c == 0:
-            ax[r, c].set(ylabel=f"\u0394 {metric} (%)")
-            ax[r, c].text(-0.5, 0.5, f"{year}", transform=ax[r, c].transAxes, ha='center', va='center')
-        if r == 0:
-            ax[r, c].set_title(f"{reg}")
-        ax[r, c].axhline(0, ls='dotted', color='k')
-
-        # Add subplot labels
-        label = next(labels)
-        ax[r, c].text(-0.15, 1.05, label, transform=ax[r, c].transAxes, fontsize=9, fontweight='bold')
-
-# Create custom legend outside of the plots
-fig_labels = ['MIT', 'CHAZ', 'STORM', 'IBTrACS']
-handles = [mpatches.Patch(color=custom_colors[i], label=fig_labels[i]) for i in range(len(fig_labels))]
-fig.legend(handles=handles, loc='center right', bbox_to_anchor=(1.02, 0.5), fontsize=6.5)
-
-save_fig_str = f"delta_{naming_dict[key]}_{metric}.png"
-plt.savefig(res_dir.joinpath(save_fig_str), dpi=300, facecolor='w', 
-            edgecolor='w', orientation='portrait', 
-            format='png', bbox_inches='tight', pad_inches=0.1)
-
-
+# Figure 1 (EAD) and Supplementary Figure 1 (rp100)
+for metric in ["EAD", "rp100"]:
+    plot_drivers_figure(delta_df, metric, dlts, region,
+                        file=res_dir.joinpath(f"delta_{naming_dict[key]}_{metric}.png"))
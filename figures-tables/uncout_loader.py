@@ -0,0 +1,62 @@
+"""
+Created on 2026-10-19
+
+description: Memoized loading of UncOutput objects and results catalog tables.
+             Every file is read once per process: results are cached by file path
+             and modification time, so a file that changed is read again (and the
+             objects of its older version are dropped). The numbers of cache hits
+             and misses are logged by report_cache_stats.
+
+@author: simonameiler
+"""
+
+import logging
+from pathlib import Path
+
+#Load Climada modules
+from climada.engine.unsequa import UncOutput
+
+LOGGER = logging.getLogger(__name__)
+
+_CACHE = {}
+CACHE_STATS = {'hits': 0, 'misses': 0}
+
+###########################################################################
+
+def report_cache_stats():
+    """ Log the numbers of cache hits and misses of this process """
+    LOGGER.info('%s cache hits, %s misses', CACHE_STATS['hits'], CACHE_STATS['misses'])
+
+def cached_read(file, reader, *args):
+    """
+    reader(file, *args), read once per file path, modification time and args.
+
+    Parameters
+    ----------
+    file : str or Path
+        File to read.
+    reader : callable
+        Function reading the file, e.g. UncOutput.from_hdf5.
+    *args : hashable
+        Further arguments of reader.
+    """
+    file = Path(file).resolve()
+    key = (str(file), file.stat().st_mtime_ns, reader, args)
+    if key in _CACHE:
+        CACHE_STATS['hits'] += 1
+    else:
+        CACHE_STATS['misses'] += 1
+        # objects read from an older version of the file are not used anymore
+        for old_key in [old_key for old_key in _CACHE
+                        if old_key[0] == key[0] and old_key[1] != key[1]]:
+            del _CACHE[old_key]
+        _CACHE[key] = reader(file, *args)
+    return _CACHE[key]
+
+def load_uncoutput(file):
+    """ UncOutput.from_hdf5(file), read once per process and file version """
+    return cached_read(file, UncOutput.from_hdf5)
+
+def clear_cache():
+    """ Drop all cached objects (the counters are kept) """
+    _CACHE.clear()
@@ -5,16 +5,20 @@ description: Data fro Supplementary Figures 8 and 9 -
              print out of hazard frequencies and intensities of present and future
              results of SI Tables are frequency and intensity changes, e.g. frequency
              future - frequency present.
+             The statistics are computed from the per-event summaries of the hazard
+             files (CHAZ_freq_inten_stats.file_stats), without loading the hazards;
+             events with non-zero intensity are selected by row (see
+             CHAZ_freq_inten_stats.py).
 
 @author: simonameiler
 """
 
 import sys
-import numpy as np
 
 #Load Climada modules
 from climada.util.constants import SYSTEM_DIR # loads default directory paths for data
-from climada.hazard import TropCyclone
+
+from CHAZ_freq_inten_stats import file_stats
 
 def main(region, period):
     
@@ -63,11 +67,10 @@ def main(region, period):
             for h3 in range(h3_min, h3_max+1):
                 for h4 in range(h4_min, h4_max+1):
                     haz_base_str = f"TC_{region}_0300as_CHAZ_{model_key[h1]}_base_{ssp_haz_key[h2]}_80ens_{cat_key[h3]}_{wind_model_key[h4]}.hdf5"
-                    tc_haz_base = TropCyclone.from_hdf5(haz_dir.joinpath(haz_base_str))
-                    ev_filt = np.where(tc_haz_base.intensity.sum(axis=1)>0)[0].tolist()
-                    haz_base = tc_haz_base.select(event_id = ev_filt)
-                    haz_base.check()
-                    tc_haz_base_dict[str(model_key[h1])+'_'+str(ssp_haz_key[h2])+'_'+str(cat_key[h3])+'_'+str(wind_model_key[h4])] = haz_base
+                    # frequency sum and mean maximum intensity of the events with
+                    # non-zero intensity, from the per-event summary of the file
+                    tc_haz_base_dict[str(model_key[h1])+'_'+str(ssp_haz_key[h2])+'_'+str(cat_key[h3])+'_'+str(wind_model_key[h4])] = \
+                        file_stats(haz_dir.joinpath(haz_base_str))
     
     # future climate
     tc_haz_fut_dict = {}
@@ -76,27 +79,26 @@ def main(region, period):
             for h3 in range(h3_min, h3_max+1):
                 for h4 in range(h4_min, h4_max+1):
                     haz_fut_str = f"TC_{region}_0300as_CHAZ_{model_key[h1]}_{period}_{ssp_haz_key[h2]}_80ens_{cat_key[h3]}_{wind_model_key[h4]}.hdf5"
-                    tc_haz_fut = TropCyclone.from_hdf5(haz_dir.joinpath(haz_fut_str))
-                    ev_filt = np.where(tc_haz_fut.intensity.sum(axis=1)>0)[0].tolist()
-                    haz_fut = tc_haz_fut.select(event_id = ev_filt)
-                    haz_fut.check()
-                    tc_haz_fut_dict[str(model_key[h1])+'_'+str(ssp_haz_key[h2])+'_'+str(cat_key[h3])+'_'+str(wind_model_key[h4])] = haz_fut
+                    # frequency sum and mean maximum intensity of the events with
+                    # non-zero intensity, from the per-event summary of the file
+                    tc_haz_fut_dict[str(model_key[h1])+'_'+str(ssp_haz_key[h2])+'_'+str(cat_key[h3])+'_'+str(wind_model_key[h4])] = \
+                        file_stats(haz_dir.joinpath(haz_fut_str))
     
     # store frequency information - present
-    for h, haz in tc_haz_base_dict.items():
-        print(h, haz.frequency.sum())    
+    for h, (freq, inten) in tc_haz_base_dict.items():
+        print(h, freq)    
     
     # store frequency information - future
-    for h, haz in tc_haz_fut_dict.items():
-        print(h, haz.frequency.sum())
+    for h, (freq, inten) in tc_haz_fut_dict.items():
+        print(h, freq)
 
     # store intensity information - present
-    for h, haz in tc_haz_base_dict.items():  
-        print(h, np.max(haz.intensity, axis=1).mean())
+    for h, (freq, inten) in tc_haz_base_dict.items():  
+        print(h, inten)
         
     # store intensity information - future
-    for h, haz in tc_haz_fut_dict.items():
-        print(h, np.max(haz.intensity, axis=1).mean())
+    for h, (freq, inten) in tc_haz_fut_dict.items():
+        print(h, inten)
     
 if __name__ == "__main__":
     main(*sys.argv[1:])
@@ -0,0 +1,114 @@
+"""
+Created on 2026-10-19
+
+description: Data for Supplementary Figures 8 and 9 - hazard frequencies and
+             intensities of present and future CHAZ hazards of all regions, GCMs,
+             SSPs, TCGI variables and wind models, with the changes future - present.
+             Sum of frequencies and mean of the maximum intensities of the events
+             with non-zero intensity, computed from the per-event summary sidecar
+             of every hazard file (hazard_summary.load_summary; computed from the
+             intensity matrix read in blocks of events if missing), on worker
+             processes across files.
+             Deliberate change to CHAZ_freq-inten_check.py, which gave the
+             numbers of data/CHAZ_freq.xlsx and data/CHAZ_int.xlsx: it passed the
+             row positions of the events with non-zero intensity as event_id to
+             Hazard.select, i.e. it selected the events shifted by one row. The
+             events with non-zero intensity are used here, so the values differ
+             slightly from the data files (e.g. base AP frequency of CESM2 ssp245
+             CRH H08: 25.3 instead of 25.2994).
+             Writes CHAZ_freq.xlsx and CHAZ_int.xlsx to the results folder, read by
+             figures-tables/CHAZ_freq_inten.py. Columns: model, scenario, TCGI,
+             wind and per region {region}_base, {region}_2050, {region}_2090,
+             {region}_delta1, {region}_delta2 (the data files have unprefixed base,
+             2050, 2090 columns repeated per region; the figure script only uses
+             the delta columns, which are named the same).
+
+             python CHAZ_freq_inten_stats.py [max_workers]
+
+@author: simonameiler
+"""
+
+import sys
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+#Load Climada modules
+from climada.util.constants import SYSTEM_DIR # loads default directory paths for data
+
+from hazard_summary import load_summary
+
+LOGGER = logging.getLogger(__name__)
+
+haz_dir = SYSTEM_DIR/"hazard/future"
+res_dir = SYSTEM_DIR/"results"
+
+REGIONS = ['AP', 'IO', 'SH', 'WP']
+# period of the file name -> column
+PERIODS = {'base': 'base', 'fut1': 2050, 'fut2': 2090}
+MODELS = ['CESM2', 'CNRM-CM6-1', 'EC-Earth3', 'IPSL-CM6A-LR', 'MIROC6', 'UKESM1-0-LL']
+SCENARIOS = ['ssp245', 'ssp370', 'ssp585']
+CATS = ['CRH', 'SD']
+WINDS = ['H08', 'ER11']
+KEY_COLS = ['model', 'scenario', 'TCGI', 'wind']
+
+############################################################################
+
+def chaz_file(region, period, model, scenario, cat, wind):
+    """ Path of a CHAZ basin hazard file """
+    return haz_dir.joinpath(
+        f"TC_{region}_0300as_CHAZ_{model}_{period}_{scenario}_80ens_{cat}_{wind}.hdf5")
+
+def file_stats(file):
+    """
+    Sum of frequencies and mean maximum intensity of the events with non-zero
+    intensity (selected by their row, not by event_id as in CHAZ_freq-inten_check.py)
+    """
+    summary = load_summary(file)
+    sel = summary['max_intensity'] > 0
+    return summary['frequency'][sel].sum(), summary['max_intensity'][sel].mean()
+
+def freq_inten_tables(max_workers=None):
+    """
+    Frequency and intensity statistics of all CHAZ hazards.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Number of worker processes. Default: number of CPUs
+
+    Returns
+    -------
+    freq, inten : pd.DataFrame
+        One row per model, scenario, TCGI and wind model, with the columns
+        {region}_base, {region}_2050, {region}_2090, {region}_delta1 (2050 - base)
+        and {region}_delta2 (2090 - base) for every region.
+    """
+    keys = [(model, scenario, cat, wind) for model in MODELS for scenario in SCENARIOS
+            for cat in CATS for wind in WINDS]
+    files = {(reg, per, *key): chaz_file(reg, per, *key)
+             for reg in REGIONS for per in PERIODS for key in keys}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        stats = dict(zip(files, executor.map(file_stats, files.values())))
+
+    tables = []
+    for i_stat in range(2):
+        table = pd.DataFrame(keys, columns=KEY_COLS)
+        for reg in REGIONS:
+            for per, col in PERIODS.items():
+                table[f'{reg}_{col}'] = [stats[reg, per, *key][i_stat] for key in keys]
+            table[f'{reg}_delta1'] = table[f'{reg}_2050'] - table[f'{reg}_base']
+            table[f'{reg}_delta2'] = table[f'{reg}_2090'] - table[f'{reg}_base']
+        tables.append(table)
+    return tables
+
+def main(max_workers=None):
+    logging.basicConfig(level=logging.INFO)
+    max_workers = None if max_workers is None else int(max_workers)
+    freq, inten = freq_inten_tables(max_workers)
+    freq.to_excel(res_dir.joinpath("CHAZ_freq.xlsx"), sheet_name='Frequency', index=False)
+    inten.to_excel(res_dir.joinpath("CHAZ_int.xlsx"), sheet_name='Intensity', index=False)
+    LOGGER.info('Wrote CHAZ_freq.xlsx and CHAZ_int.xlsx to %s', res_dir)
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
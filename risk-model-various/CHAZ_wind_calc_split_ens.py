@@ -8,7 +8,6 @@ description: Load TC tracks from the CHAZ model and calculate the 2D windfield
 """
 
 import sys
-import copy
 import numpy as np
 from pathos.pools import ProcessPool as Pool
 
@@ -16,6 +15,9 @@ from pathos.pools import ProcessPool as Pool
 from climada.hazard import Centroids, TCTracks, TropCyclone
 from climada.util.constants import SYSTEM_DIR
 
+from track_store import RaggedTracks
+from hazard_summary import event_summary, write_summary
+
 ############################################################################
 
 def main(i_file, model, scenario, cat, wind, period):
@@ -45,8 +47,12 @@ def main(i_file, model, scenario, cat, wind, period):
         #tracks_CHAZ.equal_timestep(time_step_h=1)
         return tracks_CHAZ
     
-    # call functions
-    tc_tracks = init_CHAZ_tracks_ens(model, i_file, cat, year_range, ens_nums)
+    # call functions; keep the tracks as flat arrays and build the per-track
+    # Datasets only for the chunk that is processed
+    tc_tracks = RaggedTracks.from_tctracks(
+        init_CHAZ_tracks_ens(model, i_file, cat, year_range, ens_nums))
+    # resample all tracks at once on the flat arrays
+    tc_tracks.equal_timestep(time_step_h=1.)
 
     # load centroids from this source
     cent = Centroids.from_hdf5(cent_str)
@@ -55,12 +61,11 @@ def main(i_file, model, scenario, cat, wind, period):
     pool = Pool()
     k = 1000
     for n in range(0, tc_tracks.size, k):
-        tracks = copy.deepcopy(tc_tracks)
-        tracks.data = tracks.data[n:n+k]
-        tracks.equal_timestep(time_step_h=1.)
+        tracks = tc_tracks.to_tctracks(slice(n, n+k))
         tc = TropCyclone.from_tracks(tracks, centroids=cent_tracks, pool=pool)
         haz_str = f"TC_global_0300as_CHAZ_{model}_{period}_{scenario}_2ens00{i_file}_{cat}_{wind}_{n}.hdf5"
         tc.write_hdf5(haz_dir.joinpath(haz_str))
+        write_summary(haz_dir.joinpath(haz_str), event_summary(tc))
     pool.close()
     pool.join()
 
@@ -17,9 +17,12 @@ import copy as cp
 from pathlib import Path
 
 # import CLIMADA modules:
-from climada.hazard import TropCyclone
 from climada.util.constants import SYSTEM_DIR
 
+from hazard_io import concat_hazard_files
+from basin_split import split_basins, write_hazards
+from hazard_summary import event_summary, freq_bias_corr, write_summary
+
 ############################################################################
 
 def main(model, scenario, cat, wind, period):
@@ -41,47 +44,6 @@ def main(model, scenario, cat, wind, period):
                         'WP': 22.5,
                         'global': 71.4}
     
-    # boundaries of (sub-)basins (lonmin, lonmax, latmin, latmax)
-    BASIN_BOUNDS = {
-        # North Atlantic/Eastern Pacific Basin
-        'AP': [-180.0, 0.0, 0.0, 65.0],
-    
-        # Indian Ocean Basin
-        'IO': [30.0, 100.0, 0.0, 40.0],
-    
-        # Southern Hemisphere Basin
-        'SH': [-180.0, 180.0, -60.0, 0.0],
-    
-        # Western Pacific Basin
-        'WP': [100.0, 180.0, 0.0, 65.0],
-    }
-    
-    reg_id = {'AP': 5000, 'IO': 5001, 'SH': 5002, 'WP': 5003}
-    
-    # function to split hazard set up per basin
-    def basin_split_haz(hazard, basin):
-        """ Split CHAZ global hazard up into ocean basins of choice """
-        tc_haz_split = TropCyclone()
-        # get basin bounds
-        x_min, x_max, y_min, y_max = BASIN_BOUNDS[str(basin)]
-        basin_idx = (hazard.centroids.lat > y_min) & (
-                     hazard.centroids.lat < y_max) & (
-                     hazard.centroids.lon > x_min) & (
-                     hazard.centroids.lon < x_max)
-        hazard.centroids.region_id[basin_idx] = reg_id[basin]
-        tc_haz_split = hazard.select(reg_id=reg_id[basin]) 
-        return tc_haz_split
-    
-    # function for frequency bias correction of CHAZ tracks
-    def freq_bias_corr(hazard, bsn, years):
-        num_tracks = hazard.intensity.max(axis=1).getnnz(axis=0)[0]
-        freq_IB = yrly_freq_IB_lit[bsn]
-        cor = freq_IB/(num_tracks/years)
-        freq_corr = cor/years
-        hazard.frequency = np.ones(hazard.size)*freq_corr
-        return hazard
-    
-    
     # load all CHAZ hazard files and append to list
     file_list = []
     file1 = f'TC_global_0300as_CHAZ_{model}_{period}_{scenario}_2ens00'
@@ -95,24 +57,33 @@ def main(model, scenario, cat, wind, period):
             if len(groups) == 2:
                 file_list.append(filename)
 
-    # make hazard object from the list of files
-    CHAZ_hazard = TropCyclone()
-    for fl in file_list:
-        tc_hazard = TropCyclone.from_hdf5(haz_in/fl)
-        CHAZ_hazard.append(tc_hazard)
+    # make hazard object from the list of files; sizes are read from the file
+    # headers and every chunk is copied once into the preallocated matrices
+    CHAZ_hazard = concat_hazard_files([haz_in/fl for fl in file_list])
+    
+    # per-event max intensity and basin touch mask, computed once on the global
+    # hazard and stored next to it; frequency bias correction for the globe and
+    # all basins follows from it
+    haz_global_str = haz_out.joinpath(f'TC_global_0300as_CHAZ_{model}_{period}_{scenario}_80ens_{cat}_{wind}.hdf5')
+    ev_summary = event_summary(CHAZ_hazard)
+    freq_corr = freq_bias_corr(ev_summary, yrly_freq_IB_lit, 1600) #years 8000 because 400 ensembles * 20 years
     
     #apply frequency bias correction and save
-    CHAZ_hazard = freq_bias_corr(CHAZ_hazard, 'global', 1600)
-    CHAZ_hazard.write_hdf5(haz_out.joinpath(f'TC_global_0300as_CHAZ_{model}_{period}_{scenario}_80ens_{cat}_{wind}.hdf5'))
+    CHAZ_hazard.frequency = np.ones(CHAZ_hazard.size)*freq_corr['global']
+    CHAZ_hazard.write_hdf5(haz_global_str)
+    write_summary(haz_global_str, dict(ev_summary, frequency=CHAZ_hazard.frequency))
     
-    # call basin split function and frequency bias correction and save results
-    for bsn in BASIN_BOUNDS:
-        tc_haz_basin = TropCyclone()
-        tc_haz_basin = basin_split_haz(CHAZ_hazard, bsn)
-        # frequency correction 
-        tc_haz_basin = freq_bias_corr(tc_haz_basin, bsn, 1600) #years 8000 because 400 ensembles * 20 years
-        tc_haz_basin.write_hdf5(haz_out.joinpath(
-            f"TC_{bsn}_0300as_CHAZ_{model}_{period}_{scenario}_80ens_{cat}_{wind}.hdf5")) 
+    # split into all basins in one pass, apply frequency bias correction and save
+    # results; the global hazard is left untouched
+    haz_basins = split_basins(CHAZ_hazard)
+    for bsn, tc_haz_basin in haz_basins.items():
+        tc_haz_basin.frequency = np.ones(tc_haz_basin.size)*freq_corr[bsn]
+    basin_files = {
+        bsn: haz_out.joinpath(f"TC_{bsn}_0300as_CHAZ_{model}_{period}_{scenario}_80ens_{cat}_{wind}.hdf5")
+        for bsn in haz_basins}
+    write_hazards(haz_basins, basin_files)
+    for bsn, tc_haz_basin in haz_basins.items():
+        write_summary(basin_files[bsn], event_summary(tc_haz_basin))
 
 if __name__ == "__main__":
     main(*sys.argv[1:])
@@ -7,47 +7,44 @@ description: Centroids
 """
 
 import os
+from pathlib import Path
+import numpy as np
 from climada.hazard import Centroids
-import shapely
-from shapely.ops import unary_union
-import shapely.geometry
-import cartopy.io.shapereader as shpreader
 from climada.util.constants import SYSTEM_DIR
 
+from land_mask import masked_grid_points
+from dist_coast import dist_to_coast
+
 
 def make_base_centroids(out_file_path, bounds=(-180, -60, 180, 60), res_land_arcsec=30, res_ocean_arcsec=3600,
-                        land_buffer=0.1):
+                        land_buffer=0.1, band_deg=5., max_workers=None):
+    """
+    Land points at res_land_arcsec and ocean points at res_ocean_arcsec, split by the
+    buffered Natural Earth land. The land mask is rasterized in bands of band_deg
+    degrees in parallel; partial results go to out_file_path + '.part', so that a
+    build that was interrupted is resumed by calling the function again. The distance
+    to coast is read from (and added to) the tile cache of dist_coast.
+    """
     res_land = res_land_arcsec/3600
     res_ocean = res_ocean_arcsec/3600
-    cent_land = Centroids.from_pnt_bounds(points_bounds=bounds, res=res_land)
-    cent_land.set_meta_to_lat_lon()
-    cent_ocean = Centroids.from_pnt_bounds(points_bounds=bounds, res=res_ocean)
-    cent_ocean.set_meta_to_lat_lon()
-    shpfilename = shpreader.natural_earth(category='physical', name='land', resolution='10m')
-    land = shpreader.Reader(shpfilename)
-    land_geometrys = [x.geometry for x in land.records()]
-    cu = unary_union(list(land_geometrys))
-    cu = cu.buffer(land_buffer, resolution=10)
-
-    mask = shapely.vectorized.contains(cu, cent_ocean.lon, cent_ocean.lat)
-    cent_ocean.lat = cent_ocean.lat[~mask]
-    cent_ocean.lon = cent_ocean.lon[~mask]
-
-    mask = shapely.vectorized.contains(cu, cent_land.lon, cent_land.lat)
-    cent_land.lat = cent_land.lat[mask]
-    cent_land.lon = cent_land.lon[mask]
-
-    cent = cent_land
-    cent.append(cent_ocean)
+    build_file = Path(str(out_file_path) + '.part')
+    lat_land, lon_land = masked_grid_points(build_file, 'land', bounds, res_land, land_buffer,
+                                            keep_land=True, band_deg=band_deg, max_workers=max_workers)
+    lat_ocean, lon_ocean = masked_grid_points(build_file, 'ocean', bounds, res_ocean, land_buffer,
+                                              keep_land=False, band_deg=band_deg, max_workers=max_workers)
+
+    cent = Centroids.from_lat_lon(np.concatenate([lat_land, lat_ocean]),
+                                  np.concatenate([lon_land, lon_ocean]))
     cent.set_region_id()
     #cent.set_geometry_points()
     #cent.set_lat_lon_to_meta()
     cent.set_on_land()
     cent = cent.select(extent=(bounds[0], bounds[2], bounds[1], bounds[3]))
-    cent.set_dist_coast()
+    cent.dist_coast = dist_to_coast(cent.lat, cent.lon, res_land, max_workers=max_workers)
     #cent.set_geometry_points()
     cent.check()
     cent.write_hdf5(out_file_path)
+    build_file.unlink()
 
 
 
@@ -2,40 +2,123 @@
 Adapted for code repository on 2024-02-26
 
 description: Load TC tracks from IBTrACS record and generate synthetic TC set.
-            
+             Called with one year, the tracks of that year are processed as before.
+             Called with a first and a last year (e.g. 1980 2020), IBTrACS is read
+             once for the whole range and the years are processed in parallel; the
+             netCDF files of a year are written as soon as its tracks are done.
+             The tracks of a year are selected by their IBTrACS season, read from
+             the season variable of the IBTrACS file by storm id, as year_range
+             does, so every year gets the same tracks in the same order as in a
+             single-year run.
+
 @author: simonameiler
 """
 
 import sys
-import copy as cp
+import logging
+import numpy as np
+import xarray as xr
+from pathos.pools import ProcessPool as Pool
 
 # import CLIMADA modules:
 from climada.hazard import TCTracks
+from climada.hazard.tc_tracks import IBTRACS_FILE
 from climada.util.constants import SYSTEM_DIR
 
+from track_utils import select_tracks
+from track_store import RaggedTracks, ragged_file
+
+LOGGER = logging.getLogger(__name__)
+
 ############################################################################
-    
-def main(year):
 
-    year = int(year)
-    IB_tracks_dir = SYSTEM_DIR/"tracks"/"IBTrACS"
+IB_tracks_dir = SYSTEM_DIR/"tracks"/"IBTrACS"
+
+def ibtracs_seasons(file_name=IBTRACS_FILE):
+    """ IBTrACS season of every storm, by storm id (sid) """
+    with xr.open_dataset(SYSTEM_DIR.joinpath(file_name)) as ibtracs_ds:
+        sids = ibtracs_ds['sid'].values.astype(str)
+        seasons = ibtracs_ds['season'].values.astype(int)
+    return dict(zip(sids, seasons))
+
+def load_tracks(year_range):
+    """ IBTrACS tracks of category 0 to 5 in year_range (seasons, inclusive) """
+    tracks = TCTracks.from_ibtracs_netcdf(year_range=year_range)
+    # ordered by category as the former loop over subsets of each category
+    return select_tracks(tracks, category=range(0,6), order_by='category')
+
+def synth_tracks(year, data, write_obs=None):
+    """
+    Interpolate the tracks of a year to hourly time steps, write them and
+    generate and write their probabilistic set.
+
+    Parameters
+    ----------
+    year : int
+        Year of the output folder of the synthetic tracks.
+    data : list of xarray.Dataset
+        Tracks as loaded with year_range=(year, year+1).
+    write_obs : np.array of bool, optional
+        Which of the interpolated tracks to write to IB_tracks_dir. Default: all
+
+    Returns
+    -------
+    int
+        The year.
+    """
     IB_synth_dir = SYSTEM_DIR/"tracks"/"IBTrACS_p"/f"{year}"
-    
-    # Load IBTrACS and generate probabilistic set
-    tracks = TCTracks.from_ibtracs_netcdf(year_range=(year,year+1))
-    tracks_IB = TCTracks()
-    for i in range(0,6):
-        filterdict = {'category': i}
-        tracks_IB.data.extend(tracks.subset(filterdict).data)
     # post processing, increase time steps for smoother wind field:
-    tracks_IB.equal_timestep(time_step_h=1., land_params=False)
-    tracks_IB.write_netcdf(IB_tracks_dir)
-    
-    # generate probabilistic tracks
-    IB_tracks_synth = cp.deepcopy(tracks_IB)
-    IB_tracks_synth.data = [x for x in IB_tracks_synth.data if x.time.size > 1]
+    tracks_IB = RaggedTracks.from_tctracks(TCTracks(data))
+    tracks_IB.equal_timestep(time_step_h=1.)
+    tracks_IB = tracks_IB.to_tctracks()
+    if write_obs is None:
+        tracks_IB.write_netcdf(IB_tracks_dir)
+    else:
+        TCTracks([tr for tr, write in zip(tracks_IB.data, write_obs) if write]
+                 ).write_netcdf(IB_tracks_dir)
+
+    # generate probabilistic tracks; tracks_IB is not used afterwards, so the
+    # perturbation may work on views of its tracks instead of a deep copy
+    IB_tracks_synth = select_tracks(tracks_IB, time=lambda time: time.size > 1)
     IB_tracks_synth.calc_perturbed_trajectories(nb_synth_tracks=24)
-    IB_tracks_synth.write_netcdf(IB_synth_dir)
+    # all tracks of the year in one file instead of one file per track
+    RaggedTracks.from_tctracks(IB_tracks_synth).write_netcdf(ragged_file(IB_synth_dir))
+    return year
+
+def main_batch(start_year, end_year):
+    """
+    Read IBTrACS once for seasons start_year to end_year+1 and process every year
+    in a worker process. A year gets the tracks of its season and of the next one,
+    as with year_range=(year, year+1). Observed tracks are written by the worker of
+    their own season only, so that no two workers write the same file.
+    """
+    tracks_IB = load_tracks((start_year, end_year+1))
+    season_of_sid = ibtracs_seasons()
+    seasons = np.array([season_of_sid[track.sid] for track in tracks_IB.data])
+    years = list(range(start_year, end_year+1))
+    data_years, write_years = [], []
+    for year in years:
+        sel = np.flatnonzero((seasons >= year) & (seasons <= year+1))
+        data_years.append([tracks_IB.data[i] for i in sel])
+        write_years.append((seasons[sel] == year) | (year == end_year))
+
+    pool = Pool()
+    for year in pool.uimap(synth_tracks, years, data_years, write_years):
+        LOGGER.info('%s done', year)
+    pool.close()
+    pool.join()
+
+def main(year, end_year=None):
+    logging.basicConfig(level=logging.INFO)
+
+    if end_year is not None:
+        main_batch(int(year), int(end_year))
+        return
+
+    year = int(year)
+    # Load IBTrACS and generate probabilistic set
+    tracks_IB = load_tracks((year,year+1))
+    synth_tracks(year, tracks_IB.data)
 
 if __name__ == "__main__":
-    main(*sys.argv[1:])
\ No newline at end of file
+    main(*sys.argv[1:])
@@ -13,6 +13,9 @@ import sys
 from climada.hazard import Centroids, TCTracks, TropCyclone
 from climada.util.constants import SYSTEM_DIR
 
+from track_store import RaggedTracks, ragged_file
+from hazard_summary import event_summary, write_summary
+
 ############################################################################
 
 def main(windmodel, year):
@@ -28,14 +31,19 @@ def main(windmodel, year):
     
     cent_str = SYSTEM_DIR.joinpath("earth_centroids_0300as_global.hdf5")
 
-    # load global, probabilistic IBTrACS
-    tracks = TCTracks.from_netcdf(IB_synth_dir)
+    # load global, probabilistic IBTrACS (one file per year, or a folder with
+    # one file per track as written before)
+    if ragged_file(IB_synth_dir).is_file():
+        tracks = RaggedTracks.from_netcdf(ragged_file(IB_synth_dir)).to_tctracks()
+    else:
+        tracks = TCTracks.from_netcdf(IB_synth_dir)
     
     # load centroids from this source
     cent = Centroids.from_hdf5(cent_str)
 
     tc_hazard = TropCyclone.from_tracks(tracks, centroids=cent, model=windmodel)
     tc_hazard.write_hdf5(haz_dir.joinpath(haz_str))
+    write_summary(haz_dir.joinpath(haz_str), event_summary(tc_hazard))
 
 
 if __name__ == "__main__":
@@ -3,77 +3,52 @@ Adapted for code repository on 2024-02-26
 
 description: Load single year TC hazard sets from probabilistic IBTrACS, concatenate, 
             split by basin and save.
+            The yearly files are concatenated on disk: the event and non-zero
+            counts are read from the file headers, the global datasets are
+            allocated once and filled with the yearly files read in parallel. The
+            global file is then split into the basins block by block, so the
+            global hazard is never held in memory.
             
 @author: simonameiler
 """
 
 import sys
-import numpy as np
-import copy as cp
 
 # import CLIMADA modules:
-from climada.hazard import TropCyclone
 from climada.util.constants import SYSTEM_DIR
 
+from hazard_io import concat_hazard_files
+from basin_split import BASIN_BOUNDS, split_basins_hdf5
+from hazard_summary import update_summary
+
 ############################################################################
 #windmodel = ['H08', 'ER11']
 
-def main(windmodel):
+def main(windmodel, max_workers=None):
 
     windmodel = str(windmodel)
+    max_workers = None if max_workers is None else int(max_workers)
     
     res = 300
     
     haz_dir = SYSTEM_DIR/"hazard"/"future"
     
-    # boundaries of (sub-)basins (lonmin, lonmax, latmin, latmax)
-    BASIN_BOUNDS = {
-        # North Atlantic/Eastern Pacific Basin
-        'AP': [-180.0, 0.0, 0.0, 65.0],
-    
-        # Indian Ocean Basin
-        'IO': [30.0, 100.0, 0.0, 40.0],
-    
-        # Southern Hemisphere Basin
-        'SH': [-180.0, 180.0, -60.0, 0.0],
-    
-        # Western Pacific Basin
-        'WP': [100.0, 180.0, 0.0, 65.0],
-    }
+    # all years from 1980 to 2020, in order
+    files = [haz_dir/f"TC_global_0{res}as_IBTrACS_prob_present_{windmodel}_{year}.hdf5"
+             for year in range(1980, 2021)]
+    glob_file = haz_dir.joinpath(f'TC_global_0{res}as_IBTrACS_prob_present_{windmodel}')
+    concat_hazard_files(files, out_file=glob_file, max_workers=max_workers)
     
-    reg_id = {'AP': 5000, 'IO': 5001, 'SH': 5002, 'WP': 5003}
+    # split into all basins in one pass and save results
+    basin_files = {
+        bsn: haz_dir.joinpath(f"TC_{bsn}_0{res}as_IBTrACS_prob_present_{windmodel}.hdf5")
+        for bsn in BASIN_BOUNDS}
+    split_basins_hdf5(glob_file, basin_files)
     
-    # function to split hazard set up per basin
-    def basin_split_haz(hazard, basin):
-        """ Split CHAZ global hazard up into ocean basins of choice """
-        tc_haz_split = TropCyclone()
-        # get basin bounds
-        x_min, x_max, y_min, y_max = BASIN_BOUNDS[str(basin)]
-        basin_idx = (hazard.centroids.lat > y_min) & (
-                     hazard.centroids.lat < y_max) & (
-                     hazard.centroids.lon > x_min) & (
-                     hazard.centroids.lon < x_max)
-        hazard.centroids.region_id[basin_idx] = reg_id[basin]
-        tc_haz_split = hazard.select(reg_id=reg_id[basin]) 
-        return tc_haz_split
-
-    # create tropcyclone object for 1980 and append the subsequent years
-    ib_haz = TropCyclone.from_hdf5(f"TC_global_0{res}as_IBTrACS_prob_present_{windmodel}_1980.hdf5")
-    for year in range(1981, 2021):
-        haz_str = f"TC_global_0{res}as_IBTrACS_prob_present_{windmodel}_{year}.hdf5"
-        tc_haz = TropCyclone.from_hdf5(haz_dir/haz_str)
-        ib_haz.append(tc_haz)
-        
-    ib_haz.write_hdf5(haz_dir.joinpath(f'TC_global_0{res}as_IBTrACS_prob_present_{windmodel}'))
-    
-    # call basin split function and save results
-    for bsn in BASIN_BOUNDS:
-        tc_haz_basin = TropCyclone()
-        tc_haz_basin = basin_split_haz(ib_haz, bsn)
-        tc_haz_basin.write_hdf5(haz_dir.joinpath(
-            f"TC_{bsn}_0{res}as_IBTrACS_prob_present_{windmodel}.hdf5"))
+    # per-event summaries next to the hazard files, read block by block
+    for file in [glob_file, *basin_files.values()]:
+        update_summary(file)
 
 if __name__ == "__main__":
     main(*sys.argv[1:]) 
     
-
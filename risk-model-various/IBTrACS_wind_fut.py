@@ -2,37 +2,79 @@
 Adapted for code repository on 2024-02-26
 
 description: Generate future TC hazard sets for probabilistic IBTrACS for various
-            RCPs, regions, periods and both windmodels
-            
+            RCPs, regions, periods and both windmodels.
+            scenario and future can be 'all' to generate all RCPs (26, 45, 60, 85)
+            and/or both years (2050, 2090) from one load of the present hazard.
+            The Knutson et al. (2020) scaling is computed on a proxy hazard with
+            a single centroid (same events, categories and basins), which gives
+            the factor of every event; the factors are then applied to the data
+            array of the sparse intensity matrix, whose structure is shared with
+            the present hazard.
+
 @author: simonameiler
 """
 
 import sys
+import copy as cp
+import numpy as np
 from scipy.sparse import csr_matrix
 
 # import CLIMADA modules:
 from climada.hazard import Centroids, TropCyclone
 from climada.util.constants import SYSTEM_DIR
 
+from hazard_summary import event_summary, write_summary
+
 ############################################################################
 
+RCPS = [26, 45, 60, 85]
+FUTURES = [2050, 2090]
+
+def event_proxy(tc_hazard):
+    """ Hazard with the events of tc_hazard and an intensity of 1 at one centroid """
+    proxy = cp.copy(tc_hazard)
+    proxy.centroids = Centroids.from_lat_lon(np.zeros(1), np.zeros(1))
+    proxy.intensity = csr_matrix(np.ones((tc_hazard.size, 1)))
+    proxy.fraction = csr_matrix((tc_hazard.size, 1))
+    return proxy
+
+def apply_knu_sparse(tc_hazard, proxy, future, rcp):
+    """
+    apply_climate_scenario_knu of tc_hazard, with the scaling of every event taken
+    from the proxy and applied to the non-zeros of the intensity only.
+    """
+    proxy_cc = proxy.apply_climate_scenario_knu(ref_year=future, rcp_scenario=rcp)
+    factor = proxy_cc.intensity.toarray().ravel()
+    inten = tc_hazard.intensity
+    tc_hazard_cc = cp.copy(tc_hazard)
+    for attr, val in vars(proxy_cc).items():
+        if attr not in ('centroids', 'intensity', 'fraction'):
+            setattr(tc_hazard_cc, attr, val)
+    tc_hazard_cc.intensity = csr_matrix(
+        (inten.data * np.repeat(factor, np.diff(inten.indptr)), inten.indices, inten.indptr),
+        shape=inten.shape)
+    return tc_hazard_cc
+
 def main(region, scenario, future, windmodel):
-    
+
     res = 300
     reg = str(region)
-    rcp = int(scenario)
-    future = int(future)
+    rcps = RCPS if scenario == 'all' else [int(scenario)]
+    futures = FUTURES if future == 'all' else [int(future)]
     windmodel = str(windmodel)
-    
+
     haz_dir = SYSTEM_DIR.joinpath('hazard','future')
     haz_str = f"TC_{reg}_0{res}as_IBTrACS_prob_present_{windmodel}.hdf5"
-    
+
     tc_hazard = TropCyclone.from_hdf5(haz_dir.joinpath(haz_str))
+    proxy = event_proxy(tc_hazard)
 
-    tc_hazard_cc = tc_hazard.apply_climate_scenario_knu(
-                ref_year=future, rcp_scenario=rcp)
-    haz_fut_str = f"TC_{reg}_0{res}as_IBTrACS_prob_{rcp}_{future}_{windmodel}.hdf5"
-    tc_hazard_cc.write_hdf5(haz_dir.joinpath(haz_fut_str))
+    for rcp in rcps:
+        for future in futures:
+            tc_hazard_cc = apply_knu_sparse(tc_hazard, proxy, future, rcp)
+            haz_fut_str = f"TC_{reg}_0{res}as_IBTrACS_prob_{rcp}_{future}_{windmodel}.hdf5"
+            tc_hazard_cc.write_hdf5(haz_dir.joinpath(haz_fut_str))
+            write_summary(haz_dir.joinpath(haz_fut_str), event_summary(tc_hazard_cc))
 
 if __name__ == "__main__":
     main(*sys.argv[1:])
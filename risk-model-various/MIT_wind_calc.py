@@ -8,14 +8,16 @@ description: Load TC tracks from the MIT model and calculate the 2D windfield
 """
 
 import sys
-import numpy as np
 from scipy.io import loadmat
-import datetime as dt
 
 # import CLIMADA modules:
 from climada.hazard import Centroids, TCTracks, TropCyclone
 from climada.util.constants import SYSTEM_DIR
 
+from hazard_freq import freq_per_year
+from track_store import RaggedTracks
+from hazard_summary import event_summary, write_summary
+
 ############################################################################
 
 def main(region, model, scenario, wind_model):
@@ -41,8 +43,10 @@ def main(region, model, scenario, wind_model):
             tracks_MIT = TCTracks.from_simulations_emanuel(fname, hemisphere='S')
         else:
             tracks_MIT = TCTracks.from_simulations_emanuel(fname, hemisphere='N')
+        # resample all tracks at once on the flat arrays
+        tracks_MIT = RaggedTracks.from_tctracks(tracks_MIT)
         tracks_MIT.equal_timestep(time_step_h=1)
-        return tracks_MIT
+        return tracks_MIT.to_tctracks()
     
     # call functions
     tc_tracks = init_MIT_tracks(region)
@@ -55,20 +59,10 @@ def main(region, model, scenario, wind_model):
     # apply frequency correction according to the freq scalar provided with the
     # event sets
     fname = tracks_dir.joinpath(f"Meiler_{region}_{model}_{scenario}.mat")
-    freq_year = loadmat(fname)['freqyear'][0].tolist()
-    
-    event_year = np.array([
-        dt.datetime.fromordinal(d).year 
-        for d in tc_hazard.date.astype(int)])
-
-    for i, yr in enumerate(np.unique(event_year)):
-        yr_mask = (event_year == yr)
-        yr_event_count = yr_mask.sum()
-        tc_hazard.frequency[yr_mask] = (
-        np.ones(yr_event_count) * freq_year[i] /
-        (yr_event_count * yrs_total)
-        )    
+    freq_year = loadmat(fname)['freqyear'][0]
+    tc_hazard.frequency = freq_per_year(tc_hazard.date, freq_year, yrs_total)
     tc_hazard.write_hdf5(haz_dir.joinpath(haz_str))
+    write_summary(haz_dir.joinpath(haz_str), event_summary(tc_hazard))
     tc_hazard.check()
 
 if __name__ == "__main__":
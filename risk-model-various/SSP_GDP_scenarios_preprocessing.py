@@ -2,13 +2,18 @@
 Adapted for code repository on 2024-02-26
 
 description: generation of annual growth rates relative to 2020, from SSP public database
+             The growth factors of all rows are computed at once as the cumulative
+             product over the years of the 5-yearly growth rates. They are saved
+             as csv and, if PyTables is installed, as HDF5 table, from which single
+             year columns can be read without parsing the whole csv.
 
 @author: evelynm; adapted @simonameiler
 """
+import logging
 import pandas as pd
 import numpy as np
 
-gdp_file = '/Users/simonameiler/Documents/WCR/Active_Research_Projects/TC_future/data/iamc_db.csv'
+LOGGER = logging.getLogger(__name__)
 
 """
 This input csv file was downloaded from the SSP public database (v2.0)
@@ -19,20 +24,66 @@ ISSN 0959-3780, DOI:110.1016/j.gloenvcha.2016.05.009
 Selection: 1. Region - all countries, 2. Scenarios - GDP - IASA/OECD/PIK, 3. Variable - GDP (growth Total)
 """
 
-df_growth = pd.read_csv(gdp_file, header=0)
-
-def calc_growthrate(df_growth):
-    growth = df_growth[['Model', 'Scenario', 'Region']]
-    proj_avail = np.array(df_growth.columns[5:-1].astype(int).values)
-    years = np.arange(2021,2100)
-    growth['2020'] = 1
-    for year in years:
-        proj_sel = proj_avail[((proj_avail-year)<=0) & ((proj_avail-year)>-5)]
-        growth[str(year)] = growth.apply(
-            lambda row: row[str(year-1)]*(1+df_growth.iloc[row.name][str(proj_sel[0])]/100),
-            axis=1)
-    
+GDP_DIR = '/Users/simonameiler/Documents/WCR/Active_Research_Projects/TC_future/data'
+
+def calc_growthrate(df_growth, start_year=2020, end_year=2099):
+    """
+    Growth factors of every year from start_year to end_year relative to start_year.
+
+    The growth rate of a year is the one of the latest 5-yearly projection up to
+    that year, e.g. the 2025 rate for 2025 to 2029.
+
+    Parameters
+    ----------
+    df_growth : pd.DataFrame
+        SSP database table with columns Model, Scenario, Region and the annual
+        average growth in % of the projection years.
+    start_year : int, optional
+        Reference year (factor 1). Default: 2020
+    end_year : int, optional
+        Last year. Default: 2099
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns Model, Scenario, Region and one column per year (as str).
+    """
+    years = np.arange(start_year+1, end_year+1)
+    proj_cols = [str(year) for year in years - years % 5]
+    rates = df_growth[proj_cols].to_numpy(dtype=float)
+    factors = np.cumprod(1 + rates/100, axis=1)
+
+    growth = df_growth[['Model', 'Scenario', 'Region']].copy()
+    growth[str(start_year)] = 1
+    growth = pd.concat(
+        [growth, pd.DataFrame(factors, index=growth.index, columns=years.astype(str))],
+        axis=1)
     return growth
-        
-growth = calc_growthrate(df_growth)
-growth.to_csv('/Users/simonameiler/Documents/WCR/Active_Research_Projects/TC_future/data/ssps_gdp_annual.csv')
+
+def read_growthrate(file, columns=None):
+    """
+    Read growth factors saved by this script, from the HDF5 table if it exists
+    (and PyTables is installed), else from the csv.
+
+    Parameters
+    ----------
+    file : str
+        The csv file; the HDF5 table has the same name with suffix .h5.
+    columns : list of str, optional
+        Columns to read, e.g. ['Model', 'Scenario', 'Region', '2050']. Default: all
+    """
+    h5_file = file.rsplit('.', 1)[0] + '.h5'
+    try:
+        return pd.read_hdf(h5_file, 'growth', columns=columns)
+    except (FileNotFoundError, ImportError):
+        return pd.read_csv(file, usecols=columns)
+
+if __name__ == "__main__":
+    df_growth = pd.read_csv(f'{GDP_DIR}/iamc_db.csv', header=0)
+    growth = calc_growthrate(df_growth)
+    logging.basicConfig(level=logging.INFO)
+    growth.to_csv(f'{GDP_DIR}/ssps_gdp_annual.csv')
+    try:
+        growth.to_hdf(f'{GDP_DIR}/ssps_gdp_annual.h5', key='growth', format='table')
+    except ImportError:
+        LOGGER.info('PyTables is not installed, only ssps_gdp_annual.csv was written')
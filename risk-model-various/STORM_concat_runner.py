@@ -0,0 +1,135 @@
+"""
+Created on 2026-10-19
+
+description: Concatenate the STORM hazard sets of the genesis basins to the study
+             regions and apply the frequency bias correction for all combinations
+             of GCM (or present climate), region, ensemble member and wind model.
+             Every combination is an independent task; the tasks run on a bounded
+             pool of worker processes, so that the HDF5 reads and writes of
+             different tasks overlap. The runtime and the bytes read and written
+             are reported for every task and in total.
+
+             Run all present and future tasks: python STORM_concat_runner.py [max_workers]
+
+@author: simonameiler
+"""
+
+import sys
+import time
+import logging
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+# import CLIMADA modules:
+from climada.util.constants import SYSTEM_DIR
+
+from hazard_io import concat_hazard_files, copy_hazard_file, hazard_size, patch_hdf5_datasets
+from hazard_summary import update_summary
+
+LOGGER = logging.getLogger(__name__)
+
+# genesis basins of the study regions
+STORM_REGIONS = {'AP': ['EP', 'NA'],
+                 'IO': ['NI'],
+                 'SH': ['SI', 'SP'],
+                 'WP': ['WP']}
+STORM_GCMS = ['CMCC-CM2-VHR4', 'CNRM-CM6-1-HR', 'EC-Earth3P-HR', 'HadGEM3-GC31-HM']
+WIND_MODELS = ['H08', 'ER11']
+N_ENS = 10
+FREQ_CORR_STORM = 1/1000
+
+HAZ_DIR_PRESENT = SYSTEM_DIR/"hazard"/"STORM_present"
+HAZ_DIR_FUTURE = SYSTEM_DIR/"hazard"/"future"
+
+############################################################################
+
+def storm_file(haz_dir, basin, i_ens, wind, gcm=None):
+    """ STORM hazard file of a basin (or region), gcm None for present climate """
+    prefix = '' if gcm is None else f"{gcm}_"
+    return Path(haz_dir)/f"TC_{prefix}{basin}_{i_ens}_0300as_STORM_{wind}.hdf5"
+
+def storm_tasks(winds, gcms=(None,), regions=STORM_REGIONS, n_ens=N_ENS):
+    """
+    Concatenation tasks of all combinations of GCM, region, ensemble member and
+    wind model. gcms=(None,) gives the present climate tasks.
+
+    Returns
+    -------
+    list of dict
+        'label', 'files' (input files) and 'out_file' of every task.
+    """
+    tasks = []
+    for gcm in gcms:
+        haz_dir = HAZ_DIR_PRESENT if gcm is None else HAZ_DIR_FUTURE
+        for wind in winds:
+            for reg, basins in regions.items():
+                for i_ens in range(n_ens):
+                    tasks.append({
+                        'label': f"{gcm or 'present'} {reg} {i_ens} {wind}",
+                        'files': [storm_file(haz_dir, bsn, i_ens, wind, gcm) for bsn in basins],
+                        'out_file': storm_file(haz_dir, reg, i_ens, wind, gcm)})
+    return tasks
+
+def concat_region(files, out_file, freq=FREQ_CORR_STORM):
+    """
+    Concatenate the basin files of a region to out_file and set the frequency of
+    all events to freq. A single basin is copied and patched. The per-event
+    summary is written next to out_file.
+
+    Returns
+    -------
+    dict
+        'seconds', 'bytes_read' and 'bytes_written' of the task.
+    """
+    start = time.perf_counter()
+    if len(files) == 1:
+        copy_hazard_file(files[0], out_file)
+    else:
+        concat_hazard_files(files, out_file=out_file)
+    patch_hdf5_datasets(out_file, {'frequency': np.ones(hazard_size(out_file))*freq})
+    update_summary(out_file)
+    return {'seconds': time.perf_counter() - start,
+            'bytes_read': sum(Path(file).stat().st_size for file in files),
+            'bytes_written': Path(out_file).stat().st_size}
+
+def run_tasks(tasks, max_workers=None):
+    """
+    Run concatenation tasks on a pool of worker processes.
+
+    Parameters
+    ----------
+    tasks : list of dict
+        Output of storm_tasks.
+    max_workers : int, optional
+        Number of worker processes. Default: number of CPUs
+
+    Returns
+    -------
+    list of dict
+        The tasks with their 'seconds', 'bytes_read' and 'bytes_written'.
+    """
+    start = time.perf_counter()
+    done = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(concat_region, task['files'], task['out_file']): task
+                   for task in tasks}
+        for future in as_completed(futures):
+            task = dict(futures[future], **future.result())
+            LOGGER.info('%s: %.1f s, %.1f MB read, %.1f MB written', task['label'],
+                        task['seconds'], task['bytes_read']/1e6, task['bytes_written']/1e6)
+            done.append(task)
+    LOGGER.info('%s tasks in %.1f s (%.1f s summed over tasks), %.1f GB read, %.1f GB written',
+                len(done), time.perf_counter() - start, sum(tsk['seconds'] for tsk in done),
+                sum(tsk['bytes_read'] for tsk in done)/1e9,
+                sum(tsk['bytes_written'] for tsk in done)/1e9)
+    return done
+
+def main(max_workers=None):
+    logging.basicConfig(level=logging.INFO)
+    max_workers = None if max_workers is None else int(max_workers)
+    tasks = storm_tasks(WIND_MODELS) + storm_tasks(WIND_MODELS, gcms=STORM_GCMS)
+    run_tasks(tasks, max_workers=max_workers)
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
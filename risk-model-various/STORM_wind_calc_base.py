@@ -15,6 +15,9 @@ import numpy as np
 from climada.hazard import Centroids, TCTracks, TropCyclone
 from climada.util.constants import SYSTEM_DIR
 
+from track_store import RaggedTracks
+from hazard_summary import event_summary, write_summary
+
 ############################################################################
 # i_ens = range(10)
 # i_basin = ['EP', 'NA', 'NI', 'SI', 'SP', 'WP']
@@ -32,9 +35,11 @@ def main(i_basin, i_ens, windmodel):
     def init_STORM_tracks(i_basin, i_ens):
         """ Load STORM tracks for the present climate."""
         fname = f"STORM_DATA_IBTRACS_{i_basin}_1000_YEARS_{i_ens}.txt"
-        tracks_STORM = TCTracks.from_simulations_storm(os.path.join(storm_dir, fname))
+        tracks_STORM = RaggedTracks.from_tctracks(
+            TCTracks.from_simulations_storm(os.path.join(storm_dir, fname)))
+        # resample all tracks at once on the flat arrays
         tracks_STORM.equal_timestep(time_step_h=1.)
-        return tracks_STORM
+        return tracks_STORM.to_tctracks()
     
     # call functions
     tc_tracks = TCTracks()
@@ -45,6 +50,7 @@ def main(i_basin, i_ens, windmodel):
 
     tc_hazard = TropCyclone.from_tracks(tc_tracks, centroids=cent, model=windmodel)
     tc_hazard.write_hdf5(haz_dir.joinpath(haz_str))
+    write_summary(haz_dir.joinpath(haz_str), event_summary(tc_hazard))
     tc_hazard.check()
 
 if __name__ == "__main__":
@@ -14,6 +14,9 @@ import os
 from climada.hazard import Centroids, TCTracks, TropCyclone
 from climada.util.constants import SYSTEM_DIR
 
+from track_store import RaggedTracks
+from hazard_summary import event_summary, write_summary
+
 ############################################################################
 # i_file = ['CMCC-CM2-VHR4', 'CNRM-CM6-1-HR', 'EC-Earth3P-HR', 'HadGEM3-GC31-HM']
 # i_basin = ['EP', 'NA', 'NI', 'SI', 'SP', 'WP']
@@ -33,9 +36,11 @@ def main(i_file, i_basin, i_ens, windmodel):
     def init_STORM_tracks(i_file, i_ens, i_basin):
         """ Load STORM tracks for the basin, GCM of interest."""
         fname = f"STORM_DATA_{i_file}_{i_basin}_1000_YEARS_{i_ens}_IBTRACSDELTA.txt"
-        tracks_STORM = TCTracks.from_simulations_storm(os.path.join(storm_dir, fname))
+        tracks_STORM = RaggedTracks.from_tctracks(
+            TCTracks.from_simulations_storm(os.path.join(storm_dir, fname)))
+        # resample all tracks at once on the flat arrays
         tracks_STORM.equal_timestep(time_step_h=1.)
-        return tracks_STORM
+        return tracks_STORM.to_tctracks()
     
     # call functions
     tc_tracks = TCTracks()
@@ -46,6 +51,7 @@ def main(i_file, i_basin, i_ens, windmodel):
 
     tc_hazard = TropCyclone.from_tracks(tc_tracks, centroids=cent, model=windmodel)
     tc_hazard.write_hdf5(haz_dir.joinpath(haz_str))
+    write_summary(haz_dir.joinpath(haz_str), event_summary(tc_hazard))
     tc_hazard.check()
 
 if __name__ == "__main__":
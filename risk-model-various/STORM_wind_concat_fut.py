@@ -3,67 +3,34 @@ Adapted for code repository on 2024-02-26
 
 description: Load STORM windfields from genesis basins, concatenate to study regions,
             apply frequency bias correction, save. Future climate.
+            i_file and i_wind can be 'all'; all tasks run in parallel (see
+            STORM_concat_runner).
 
 @author: simonameiler
 """
 
 import sys
-import numpy as np
-import copy as cp
+import logging
 
-# import CLIMADA modules:
-from climada.hazard import TropCyclone
-from climada.util.constants import SYSTEM_DIR
+from STORM_concat_runner import STORM_GCMS, WIND_MODELS, storm_tasks, run_tasks
 
 ############################################################################
 # i_file = ['CMCC-CM2-VHR4', 'CNRM-CM6-1-HR', 'EC-Earth3P-HR', 'HadGEM3-GC31-HM']
 #i_wind = ['H08', 'ER11']
 # i_ens = range(10)
 # i_basin = ['EP', 'NA', 'NI', 'SI', 'SP', 'WP']
-def main(i_file, i_wind):
+def main(i_file, i_wind, max_workers=None):
+    logging.basicConfig(level=logging.INFO)
     
     i_file = str(i_file)
     i_wind = str(i_wind)
-    
-    haz_dir = SYSTEM_DIR/"hazard"/"future"
-    
-    regions = {'AP': ['EP', 'NA'],
-               'IO': 'NI',
-               'SH': ['SI', 'SP'],
-               'WP': 'WP'}
-    
-    freq_corr_STORM = 1/1000
-    
-    # load all STORM hazard files and append to list
-    for reg in regions.keys():
-        for i_ens in range(10):
-            if reg == 'IO':
-                i_basin = regions[reg]
-                tc_hazard = TropCyclone.from_hdf5(haz_dir/f"TC_{i_file}_{i_basin}_{i_ens}_0300as_STORM_{i_wind}.hdf5")
-                tc_hazard.frequency = np.ones(tc_hazard.size)*freq_corr_STORM
-                tc_hazard.write_hdf5(haz_dir/f"TC_{i_file}_{reg}_{i_ens}_0300as_STORM_{i_wind}.hdf5")
-            
-            elif reg == 'WP':
-                i_basin = regions[reg]
-                tc_hazard = TropCyclone.from_hdf5(haz_dir/f"TC_{i_file}_{i_basin}_{i_ens}_0300as_STORM_{i_wind}.hdf5")
-                tc_hazard.frequency = np.ones(tc_hazard.size)*freq_corr_STORM
-                tc_hazard.write_hdf5(haz_dir/f"TC_{i_file}_{reg}_{i_ens}_0300as_STORM_{i_wind}.hdf5")
-            
-            else:
-                reg_list = regions[reg]
-                STORM_hazard = []
-                for i_basin in reg_list:
-                    tc_hazard = TropCyclone.from_hdf5(haz_dir/f"TC_{i_file}_{i_basin}_{i_ens}_0300as_STORM_{i_wind}.hdf5")
-                    STORM_hazard.append(tc_hazard)
-                        
-                STORM_master = cp.deepcopy(STORM_hazard[0])
-                for haz in range(1,len(STORM_hazard)):
-                    STORM_master.append(STORM_hazard[haz])            
-                
-                STORM_master.frequency = np.ones(STORM_master.size)*freq_corr_STORM
-                STORM_master.write_hdf5(haz_dir/f"TC_{i_file}_{reg}_{i_ens}_0300as_STORM_{i_wind}.hdf5")
+    gcms = STORM_GCMS if i_file == 'all' else [i_file]
+    winds = WIND_MODELS if i_wind == 'all' else [i_wind]
+    max_workers = None if max_workers is None else int(max_workers)
 
-if __name__ == "__main__":
-    main(*sys.argv[1:]) 
-    
+    # regions made of one genesis basin are copied and their frequency is patched
+    # in the file; the others are concatenated directly into the output file
+    run_tasks(storm_tasks(winds, gcms=gcms), max_workers=max_workers)
 
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,248 @@
+"""
+Created on 2026-10-19
+
+description: Split a global TC hazard set into the ocean basins of the study in a
+             single pass: the basin of every centroid is computed once, the columns
+             of the CSR matrices are partitioned into all basins in one sweep over
+             the non-zeros and the regional hazards are written in parallel. The
+             input hazard is left untouched.
+             A global hazard file can also be split directly on disk, block of
+             events by block of events, without loading the global hazard.
+
+@author: simonameiler
+"""
+
+import logging
+import copy as cp
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import h5py
+from scipy import sparse
+
+# import CLIMADA modules:
+from climada.hazard import Centroids
+
+from hazard_io import CENTR_GROUP, CSR_VARS
+
+LOGGER = logging.getLogger(__name__)
+
+# boundaries of (sub-)basins (lonmin, lonmax, latmin, latmax)
+BASIN_BOUNDS = {
+    # North Atlantic/Eastern Pacific Basin
+    'AP': [-180.0, 0.0, 0.0, 65.0],
+
+    # Indian Ocean Basin
+    'IO': [30.0, 100.0, 0.0, 40.0],
+
+    # Southern Hemisphere Basin
+    'SH': [-180.0, 180.0, -60.0, 0.0],
+
+    # Western Pacific Basin
+    'WP': [100.0, 180.0, 0.0, 65.0],
+}
+
+REG_ID = {'AP': 5000, 'IO': 5001, 'SH': 5002, 'WP': 5003}
+
+############################################################################
+
+def centroid_basin_labels(lat, lon, basin_bounds=BASIN_BOUNDS):
+    """
+    Index of the basin (in the order of basin_bounds) of every centroid.
+
+    Centroids outside all basins get -1. Bounds are exclusive, as in the former
+    per-basin selection. Raises a ValueError if basins overlap.
+    """
+    labels = np.full(np.size(lat), -1, dtype=np.int8)
+    for i_bsn, (x_min, x_max, y_min, y_max) in enumerate(basin_bounds.values()):
+        basin_idx = (lat > y_min) & (lat < y_max) & (lon > x_min) & (lon < x_max)
+        if (labels[basin_idx] >= 0).any():
+            raise ValueError('Overlapping basin bounds cannot be split in one pass.')
+        labels[basin_idx] = i_bsn
+    return labels
+
+def _basin_columns(labels, n_basins):
+    """ Column index of every centroid within its basin and basin sizes """
+    counts = np.bincount(labels[labels >= 0], minlength=n_basins)
+    col_new = np.zeros(labels.size, dtype=np.int64)
+    for i_bsn in range(n_basins):
+        col_new[labels == i_bsn] = np.arange(counts[i_bsn])
+    return col_new, counts
+
+def split_csr(mat, labels, n_basins):
+    """
+    Column blocks of a CSR matrix for every basin label.
+
+    The non-zeros are grouped by the basin of their column with one stable
+    (radix) sort of the int8 labels; rows and column order within a basin are
+    kept, so every block equals mat[:, labels == i_bsn].
+
+    Parameters
+    ----------
+    mat : scipy.sparse.csr_matrix
+        Matrix with one column per centroid.
+    labels : np.array
+        Basin index of every column, -1 for columns outside all basins.
+    n_basins : int
+        Number of basins.
+
+    Returns
+    -------
+    list of scipy.sparse.csr_matrix
+        One matrix per basin.
+    """
+    col_new, counts = _basin_columns(labels, n_basins)
+    n_rows = mat.shape[0]
+    lab_nz = labels[mat.indices]
+    order = np.argsort(lab_nz, kind='stable')
+    bounds = np.searchsorted(lab_nz[order], np.arange(n_basins+1))
+    row_nz = np.repeat(np.arange(n_rows, dtype=mat.indices.dtype), np.diff(mat.indptr))
+
+    blocks = []
+    for i_bsn in range(n_basins):
+        idx = order[bounds[i_bsn]:bounds[i_bsn+1]]
+        indptr = np.searchsorted(row_nz[idx], np.arange(n_rows+1))
+        blocks.append(sparse.csr_matrix(
+            (mat.data[idx], col_new[mat.indices[idx]], indptr),
+            shape=(n_rows, counts[i_bsn])))
+    return blocks
+
+def split_basins(hazard, basin_bounds=BASIN_BOUNDS, reg_id=REG_ID):
+    """
+    Split a global hazard into all basins at once.
+
+    Parameters
+    ----------
+    hazard : TropCyclone
+        Global hazard. It is not modified.
+    basin_bounds : dict, optional
+        Basin name -> [lonmin, lonmax, latmin, latmax]. Default: BASIN_BOUNDS
+    reg_id : dict, optional
+        Basin name -> region_id given to the centroids of the basin hazard.
+
+    Returns
+    -------
+    dict
+        Basin name -> TropCyclone restricted to the centroids of the basin. The
+        per-event arrays are shared with the input hazard.
+    """
+    labels = centroid_basin_labels(
+        hazard.centroids.lat, hazard.centroids.lon, basin_bounds)
+    n_basins = len(basin_bounds)
+    inten_list = split_csr(hazard.intensity, labels, n_basins)
+    if hazard.fraction.shape == hazard.intensity.shape:
+        frac_list = split_csr(hazard.fraction, labels, n_basins)
+    else:
+        frac_list = [sparse.csr_matrix((hazard.size, inten.shape[1])) for inten in inten_list]
+
+    haz_dict = {}
+    for i_bsn, basin in enumerate(basin_bounds):
+        haz_bsn = cp.copy(hazard)
+        haz_bsn.centroids = hazard.centroids.select(sel_cen=labels == i_bsn)
+        haz_bsn.centroids.region_id = np.full(haz_bsn.centroids.size, reg_id[basin])
+        haz_bsn.intensity = inten_list[i_bsn]
+        haz_bsn.fraction = frac_list[i_bsn]
+        haz_dict[basin] = haz_bsn
+    return haz_dict
+
+def write_hazards(haz_dict, out_files, max_workers=None):
+    """
+    Write hazards in parallel.
+
+    Parameters
+    ----------
+    haz_dict : dict
+        Key -> hazard, e.g. the output of split_basins.
+    out_files : dict
+        Key -> output file path.
+    max_workers : int, optional
+        Number of writer threads. Default: one per hazard.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers or len(haz_dict)) as executor:
+        futures = [executor.submit(haz.write_hdf5, out_files[key])
+                   for key, haz in haz_dict.items()]
+        for future in futures:
+            future.result()
+
+def _basin_nnz(hf_csr, labels, n_basins, block_nnz):
+    """ Number of non-zeros of a stored CSR matrix in the columns of every basin """
+    nnz = np.zeros(n_basins+1, dtype=np.int64)
+    indices = hf_csr['indices']
+    for start in range(0, indices.shape[0], block_nnz):
+        nnz += np.bincount(labels[indices[start:start+block_nnz]] + 1, minlength=n_basins+1)
+    return nnz[1:]
+
+def split_basins_hdf5(file, out_files, basin_bounds=BASIN_BOUNDS, reg_id=REG_ID,
+                      block_events=10000):
+    """
+    Split a global hazard file into basin hazard files without loading it.
+
+    The non-zeros per basin are counted first, so that the datasets of every
+    basin file are allocated at their final size; the CSR matrices are then read
+    in blocks of block_events events, split with split_csr and written to all
+    basin files. The result is the same as split_basins and write_hazards.
+
+    Parameters
+    ----------
+    file : str or Path
+        Global hazard file written by Hazard.write_hdf5.
+    out_files : dict
+        Basin name -> output file path, for all basins of basin_bounds.
+    basin_bounds : dict, optional
+        Basin name -> [lonmin, lonmax, latmin, latmax]. Default: BASIN_BOUNDS
+    reg_id : dict, optional
+        Basin name -> region_id given to the centroids of the basin hazard.
+    block_events : int, optional
+        Number of events read at once. Default: 10000
+    """
+    n_basins = len(basin_bounds)
+    with h5py.File(file, 'r') as hf_data:
+        centroids = Centroids.from_hdf5(hf_data[CENTR_GROUP])
+        labels = centroid_basin_labels(centroids.lat, centroids.lon, basin_bounds)
+        n_events = hf_data['event_id'].shape[0]
+        csr_vars = [var for var in CSR_VARS if var in hf_data]
+        nnz = {var: _basin_nnz(hf_data[var], labels, n_basins, block_events*100)
+               for var in csr_vars}
+
+        hf_outs = [h5py.File(out_files[basin], 'w') for basin in basin_bounds]
+        try:
+            for i_bsn, (basin, hf_out) in enumerate(zip(basin_bounds, hf_outs)):
+                LOGGER.info('Writing %s', out_files[basin])
+                for var, val in hf_data.items():
+                    if var not in csr_vars and var != CENTR_GROUP:
+                        hf_data.copy(val, hf_out, name=var)
+                cen_bsn = centroids.select(sel_cen=labels == i_bsn)
+                cen_bsn.region_id = np.full(cen_bsn.size, reg_id[basin])
+                cen_bsn.write_hdf5(hf_out.create_group(CENTR_GROUP))
+                for var in csr_vars:
+                    idx_dtype = np.int32 if nnz[var][i_bsn] < np.iinfo(np.int32).max else np.int64
+                    hf_csr = hf_out.create_group(var)
+                    hf_csr.create_dataset('data', shape=(nnz[var][i_bsn],),
+                                          dtype=hf_data[var]['data'].dtype)
+                    hf_csr.create_dataset('indices', shape=(nnz[var][i_bsn],), dtype=idx_dtype)
+                    hf_csr.create_dataset('indptr', data=np.zeros(n_events+1, dtype=idx_dtype))
+                    hf_csr.attrs['shape'] = (n_events, cen_bsn.size)
+
+            for var in csr_vars:
+                hf_csr = hf_data[var]
+                if tuple(hf_csr.attrs['shape'])[0] == 0:
+                    # fraction not set: keep empty matrices of the basin shape
+                    continue
+                indptr = hf_csr['indptr'][:].astype(np.int64)
+                nnz_off = np.zeros(n_basins, dtype=np.int64)
+                for row in range(0, n_events, block_events):
+                    row_end = min(row + block_events, n_events)
+                    start, end = indptr[row], indptr[row_end]
+                    mat = sparse.csr_matrix(
+                        (hf_csr['data'][start:end], hf_csr['indices'][start:end],
+                         indptr[row:row_end+1] - start),
+                        shape=(row_end - row, labels.size))
+                    for i_bsn, block in enumerate(split_csr(mat, labels, n_basins)):
+                        out_csr = hf_outs[i_bsn][var]
+                        off = nnz_off[i_bsn]
+                        out_csr['data'][off:off+block.nnz] = block.data
+                        out_csr['indices'][off:off+block.nnz] = block.indices
+                        out_csr['indptr'][row+1:row_end+1] = block.indptr[1:] + off
+                        nnz_off[i_bsn] += block.nnz
+        finally:
+            for hf_out in hf_outs:
+                hf_out.close()
@@ -0,0 +1,272 @@
+"""
+Created on 2026-10-19
+
+description: Cached distance to coast for global centroids. The distance is
+             computed coarse-to-fine on rasters instead of point by point: the
+             nearest coast pixel of a coarse global raster gives the distance far
+             from the coast, and Euclidean distance transforms (EDT) on fixed global
+             tiles (with a halo) give the distance near the coast at the grid
+             resolution.
+             The tiles are cached in an HDF5 file per resolution in SYSTEM_DIR, so
+             extending a grid (e.g. from the nopoles bounds to +-90 degrees) only
+             computes the tiles that are new.
+
+@author: simonameiler
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import h5py
+from scipy import ndimage
+from scipy.spatial import cKDTree
+from rasterio import Affine
+
+# import CLIMADA modules:
+from climada.util.constants import SYSTEM_DIR, ONE_LAT_KM, EARTH_RADIUS_KM
+
+from land_mask import load_land_geometries, rasterize_land, _init_worker
+
+LOGGER = logging.getLogger(__name__)
+
+# tile states in the cache file
+TILE_MISSING = 0
+TILE_FINE = 1
+TILE_COARSE = 2
+
+############################################################################
+
+def cache_file_name(res):
+    """ Default cache file of a grid resolution (in degrees) """
+    return SYSTEM_DIR.joinpath(f'dist_coast_{int(round(res*3600)):04d}as.hdf5')
+
+def _haversine_m(lat1, lon1, lat2, lon2):
+    """ Great circle distance in meters """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    hav = (np.sin((lat2-lat1)/2)**2
+           + np.cos(lat1)*np.cos(lat2)*np.sin((lon2-lon1)/2)**2)
+    return 2*EARTH_RADIUS_KM*1000*np.arcsin(np.sqrt(np.clip(hav, 0, 1)))
+
+def _pixel_lat(row, res):
+    return 90 - (row+0.5)*res
+
+def _pixel_lon(col, res):
+    return -180 + (col+0.5)*res
+
+def _coast_pixels(land, wrap_lon=False):
+    """ Land pixels with an ocean pixel among their 4 neighbours """
+    padded = np.pad(land, ((1, 1), (0, 0)), mode='edge')
+    padded = np.pad(padded, ((0, 0), (1, 1)), mode='wrap' if wrap_lon else 'edge')
+    ocean_nb = (~padded[:-2, 1:-1] | ~padded[2:, 1:-1]
+                | ~padded[1:-1, :-2] | ~padded[1:-1, 2:])
+    return land & ocean_nb
+
+def _nearest_coast_dist(coast, row0, col0, res, lat_ref):
+    """
+    Distance in meters from every pixel of coast to the nearest coast pixel.
+
+    The nearest pixel is found with an EDT whose longitude spacing is scaled by
+    cos(lat_ref); the distance to it is the great circle distance. row0, col0 are
+    the global pixel indices of coast[0, 0].
+    """
+    if not coast.any():
+        return np.full(coast.shape, np.nan)
+    sampling = (1., max(np.cos(np.radians(lat_ref)), 1e-3))
+    idx_row, idx_col = ndimage.distance_transform_edt(
+        ~coast, sampling=sampling, return_distances=False, return_indices=True)
+    rows = np.arange(coast.shape[0])[:, None] + row0
+    cols = np.arange(coast.shape[1])[None, :] + col0
+    return _haversine_m(_pixel_lat(rows, res), _pixel_lon(cols, res),
+                        _pixel_lat(idx_row+row0, res), _pixel_lon(idx_col+col0, res))
+
+def _land_window(row0, row1, col0, col1, res, n_cols, land_geoms=None, land_bounds=None):
+    """ Land raster of global rows row0:row1 and columns col0:col1 (wrapped in lon) """
+    runs = []
+    start = col0
+    while start < col1:
+        col_glb = start % n_cols
+        n_run = min(col1-start, n_cols-col_glb)
+        transform = Affine(res, 0, -180 + col_glb*res, 0, -res, 90 - row0*res)
+        runs.append(rasterize_land(transform, (row1-row0, n_run), 0.,
+                                   land_geoms, land_bounds).astype(bool))
+        start += n_run
+    return np.hstack(runs)
+
+def _unit_vectors(lat, lon):
+    """ Points on the unit sphere, their chord distance is monotonic in the great circle one """
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat)*np.cos(lon), np.cos(lat)*np.sin(lon), np.sin(lat)])
+
+def coarse_dist(coarse_res, land_geoms, land_bounds):
+    """
+    Global distance to coast (m) on the coarse raster.
+
+    The nearest coast pixel of every pixel is searched on the sphere (k-d tree of
+    unit vectors), which is exact across the dateline and at high latitudes where
+    a planar EDT over the whole globe would pick the wrong pixel.
+    """
+    n_rows = int(round(180/coarse_res))
+    n_cols = int(round(360/coarse_res))
+    land = _land_window(0, n_rows, 0, n_cols, coarse_res, n_cols, land_geoms, land_bounds)
+    coast_row, coast_col = np.nonzero(_coast_pixels(land, wrap_lon=True))
+    tree = cKDTree(_unit_vectors(_pixel_lat(coast_row, coarse_res),
+                                 _pixel_lon(coast_col, coarse_res)))
+    dist = np.empty((n_rows, n_cols), dtype=np.float32)
+    lon = _pixel_lon(np.arange(n_cols), coarse_res)
+    for row in range(n_rows):
+        lat = np.full(n_cols, _pixel_lat(row, coarse_res))
+        _, idx = tree.query(_unit_vectors(lat, lon))
+        dist[row] = _haversine_m(lat, lon, _pixel_lat(coast_row[idx], coarse_res),
+                                 _pixel_lon(coast_col[idx], coarse_res))
+    return dist
+
+def _tile_dist(i_row, i_col, res, tile_px, halo_px, n_rows, n_cols):
+    """
+    Fine distance to coast (m) of a tile, NaN where the nearest coast may lie
+    outside the halo.
+    """
+    row0, col0 = i_row*tile_px, i_col*tile_px
+    row1, col1 = min(row0+tile_px, n_rows), col0+tile_px
+    win_row0, win_row1 = max(row0-halo_px, 0), min(row1+halo_px, n_rows)
+    land = _land_window(win_row0, win_row1, col0-halo_px, col1+halo_px, res, n_cols)
+    lat_max = max(abs(_pixel_lat(win_row0, res)), abs(_pixel_lat(win_row1-1, res)))
+    dist = _nearest_coast_dist(_coast_pixels(land), win_row0, col0-halo_px, res,
+                               (_pixel_lat(row0, res) + _pixel_lat(row1-1, res))/2)
+    dist = dist[row0-win_row0:row1-win_row0, halo_px:halo_px+tile_px]
+    halo_m = halo_px*res*ONE_LAT_KM*1000*np.cos(np.radians(min(lat_max, 89.9)))
+    dist[dist > halo_m] = np.nan
+    return dist.astype(np.float32)
+
+def _coarse_lookup(coarse, coarse_res, lat, lon):
+    row = np.clip(((90-lat)/coarse_res).astype(np.int64), 0, coarse.shape[0]-1)
+    col = (np.floor((lon+180)/coarse_res).astype(np.int64)) % coarse.shape[1]
+    return coarse[row, col]
+
+def _open_cache(cache_file, params):
+    """ Open the cache file, creating it (with the coarse raster) if needed """
+    hf_cache = h5py.File(cache_file, 'a')
+    if 'tile_state' in hf_cache:
+        for key, val in params.items():
+            if not np.isclose(hf_cache.attrs[key], val):
+                hf_cache.close()
+                raise ValueError(f'Cache file {cache_file} was made with '
+                                 f'different {key}: {hf_cache.attrs[key]}')
+        return hf_cache
+    hf_cache.close()
+    hf_cache = h5py.File(cache_file, 'w')
+    LOGGER.info('Computing coarse distance to coast at %s degrees.', params['coarse_res'])
+    hf_cache.attrs.update(params)
+    hf_cache.create_dataset('coarse', data=coarse_dist(params['coarse_res'],
+                                                        *load_land_geometries()),
+                            compression='gzip')
+    n_tiles = (int(np.ceil(180/params['tile_deg'])), int(np.ceil(360/params['tile_deg'])))
+    hf_cache.create_dataset('tile_state', data=np.zeros(n_tiles, dtype=np.int8))
+    hf_cache.create_group('tiles')
+    return hf_cache
+
+def dist_to_coast(lat, lon, res, cache_file=None, tile_deg=10., halo_deg=2.,
+                  coarse_res=0.1, max_workers=None):
+    """
+    Distance to coast (in meters, unsigned) of points, as Centroids.dist_coast.
+
+    The distance rasters of the tiles that contain the points are read from the
+    cache file; missing tiles are computed in parallel and added to the cache.
+    Points within halo_deg of the coast get the fine distance (resolution res),
+    points further away the coarse one (resolution coarse_res).
+
+    Parameters
+    ----------
+    lat, lon : np.array
+        Coordinates of the points.
+    res : float
+        Resolution of the fine rasters in degrees, e.g. the centroids resolution.
+    cache_file : str or Path, optional
+        HDF5 cache file. Default: cache_file_name(res)
+    tile_deg : float, optional
+        Size of the tiles in degrees, a multiple of res. Default: 10
+    halo_deg : float, optional
+        Halo around each tile within which the coast is searched. Default: 2
+    coarse_res : float, optional
+        Resolution of the coarse global raster in degrees. Default: 0.1
+    max_workers : int, optional
+        Number of worker processes. Default: number of CPUs
+
+    Returns
+    -------
+    np.array
+    """
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    tile_px = int(round(tile_deg/res))
+    n_rows, n_cols = int(round(180/res)), int(round(360/res))
+    if not np.isclose(tile_px*res, tile_deg) or n_cols % tile_px:
+        raise ValueError(f'Tile size {tile_deg} must be a multiple of the resolution {res} '
+                         'and divide 360 degrees.')
+    halo_px = int(np.ceil(halo_deg/res))
+    if cache_file is None:
+        cache_file = cache_file_name(res)
+    params = {'res': res, 'tile_deg': tile_deg, 'halo_deg': halo_deg, 'coarse_res': coarse_res}
+
+    row = np.clip(((90-lat)/res).astype(np.int64), 0, n_rows-1)
+    col = np.floor((lon+180)/res).astype(np.int64) % n_cols
+    tile_id = (row//tile_px)*(n_cols//tile_px) + col//tile_px
+
+    with _open_cache(cache_file, params) as hf_cache:
+        coarse = hf_cache['coarse'][:]
+        tile_state = hf_cache['tile_state'][:]
+        tiles_pts = np.unique(tile_id)
+        todo = []
+        for tid in tiles_pts[tile_state.flat[tiles_pts] == TILE_MISSING]:
+            i_row, i_col = np.unravel_index(tid, tile_state.shape)
+            # coarse-to-fine: skip the fine EDT where the coast is beyond the halo
+            rows_c = slice(int(i_row*tile_deg/coarse_res),
+                           int(np.ceil(min((i_row+1)*tile_deg, 180)/coarse_res)))
+            cols_c = slice(int(i_col*tile_deg/coarse_res),
+                           int(np.ceil((i_col+1)*tile_deg/coarse_res)))
+            coarse_min = coarse[rows_c, cols_c].min()
+            if coarse_min > (halo_deg + 2*coarse_res)*ONE_LAT_KM*1000:
+                tile_state[i_row, i_col] = TILE_COARSE
+            else:
+                todo.append((i_row, i_col))
+        hf_cache['tile_state'][:] = tile_state
+        LOGGER.info('Distance to coast: %s tiles, %s to compute.', tiles_pts.size, len(todo))
+
+        if todo:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     initializer=_init_worker) as executor:
+                futures = {executor.submit(_tile_dist, i_row, i_col, res, tile_px,
+                                           halo_px, n_rows, n_cols): (i_row, i_col)
+                           for i_row, i_col in todo}
+                for future in as_completed(futures):
+                    i_row, i_col = futures[future]
+                    dist = future.result()
+                    rows_t = np.arange(dist.shape[0])[:, None] + i_row*tile_px
+                    cols_t = np.arange(dist.shape[1])[None, :] + i_col*tile_px
+                    fill = np.isnan(dist)
+                    if fill.any():
+                        lat_t = np.broadcast_to(_pixel_lat(rows_t, res), dist.shape)
+                        lon_t = np.broadcast_to(_pixel_lon(cols_t, res), dist.shape)
+                        dist[fill] = _coarse_lookup(coarse, coarse_res, lat_t[fill], lon_t[fill])
+                    # a tile written by a run that stopped before marking it done
+                    # is still missing: replace it
+                    if f'{i_row}_{i_col}' in hf_cache['tiles']:
+                        del hf_cache['tiles'][f'{i_row}_{i_col}']
+                    hf_cache['tiles'].create_dataset(f'{i_row}_{i_col}', data=dist,
+                                                     compression='gzip', shuffle=True)
+                    hf_cache['tile_state'][i_row, i_col] = TILE_FINE
+                    hf_cache.flush()
+            tile_state = hf_cache['tile_state'][:]
+
+        dist_pts = np.empty(lat.size)
+        order = np.argsort(tile_id, kind='stable')
+        bounds = np.searchsorted(tile_id[order], tiles_pts, side='left')
+        bounds = np.append(bounds, order.size)
+        for tid, start, end in zip(tiles_pts, bounds[:-1], bounds[1:]):
+            idx = order[start:end]
+            i_row, i_col = np.unravel_index(tid, tile_state.shape)
+            if tile_state[i_row, i_col] == TILE_COARSE:
+                dist_pts[idx] = _coarse_lookup(coarse, coarse_res, lat[idx], lon[idx])
+            else:
+                tile = hf_cache['tiles'][f'{i_row}_{i_col}'][:]
+                dist_pts[idx] = tile[row[idx]-i_row*tile_px, col[idx]-i_col*tile_px]
+    return dist_pts
@@ -0,0 +1,63 @@
+"""
+Created on 2026-10-19
+
+description: Frequency corrections of hazard sets by event year. The year of every
+             event is looked up in a table over the ordinal range of the event
+             dates, and the per-year scalars are distributed over the events of
+             each year with one gather (e.g. the MIT 'freqyear' of each simulated
+             year).
+
+@author: simonameiler
+"""
+
+import datetime as dt
+import numpy as np
+
+############################################################################
+
+def event_years(date):
+    """
+    Calendar year of every event from its proleptic Gregorian ordinal date.
+
+    Only the years of the ordinal range spanned by the dates are converted, once,
+    into a table that is then indexed with all event dates.
+    """
+    date = np.asarray(date).astype(int)
+    if date.size == 0:
+        return np.zeros(0, dtype=int)
+    d_min, d_max = date.min(), date.max()
+    year_min, year_max = dt.date.fromordinal(d_min).year, dt.date.fromordinal(d_max).year
+    # ordinal of Jan 1st of every year in range, then year of each day in range
+    jan1 = np.array([dt.date(year, 1, 1).toordinal()
+                     for year in range(year_min, year_max+2)])
+    days = np.arange(d_min, d_max+1)
+    year_table = year_min + np.searchsorted(jan1, days, side='right') - 1
+    return year_table[date - d_min]
+
+def freq_per_year(date, freq_year, yrs_total):
+    """
+    Event frequencies from per-year frequency scalars.
+
+    Every event of the i-th year (in ascending order of the years present in the
+    set) gets freq_year[i] / (number of events in that year * yrs_total).
+
+    Parameters
+    ----------
+    date : np.array
+        Ordinal date of every event (Hazard.date).
+    freq_year : array_like
+        One frequency scalar per year of the event set, in ascending year order.
+    yrs_total : float
+        Number of years the event set represents.
+
+    Returns
+    -------
+    np.array
+        Frequency of every event.
+    """
+    _, year_idx, year_count = np.unique(
+        event_years(date), return_inverse=True, return_counts=True)
+    freq_year = np.asarray(freq_year, dtype=float)
+    if freq_year.size < year_count.size:
+        raise ValueError('Fewer frequency scalars than years in the event set.')
+    return (freq_year[:year_count.size] / (year_count * yrs_total))[year_idx]
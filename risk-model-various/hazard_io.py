@@ -0,0 +1,378 @@
+"""
+Created on 2026-10-19
+
+description: HDF5-level helpers for hazard sets written with Hazard.write_hdf5.
+             Concatenate many hazard files (e.g. the CHAZ chunk files) in one pass
+             instead of growing a hazard with repeated Hazard.append calls: the
+             file headers are scanned for event and non-zero counts first, the
+             CSR arrays are allocated once and every file is copied in once.
+             Metadata-only edits (e.g. a new frequency vector) are patched into
+             the HDF5 file in place instead of loading and rewriting the hazard.
+
+@author: simonameiler
+"""
+
+import os
+import logging
+import shutil
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from pathlib import Path
+import numpy as np
+import h5py
+from scipy import sparse
+
+# import CLIMADA modules:
+from climada.hazard import Centroids, TropCyclone
+
+LOGGER = logging.getLogger(__name__)
+
+# per-event variables of a TropCyclone as stored by Hazard.write_hdf5; every other
+# non-matrix dataset (haz_type, units, ...) is the same in all files of a set
+EVENT_VARS = ('event_id', 'event_name', 'date', 'orig', 'frequency', 'category', 'basin')
+STR_EVENT_VARS = ('event_name', 'basin')
+CSR_VARS = ('intensity', 'fraction')
+CENTR_GROUP = 'centroids'
+
+############################################################################
+
+def _centroid_coords(hf_centr):
+    """ Return lat, lon of the centroids group of an open hazard file """
+    if 'lat' in hf_centr and 'lon' in hf_centr:
+        return hf_centr['lat'][:], hf_centr['lon'][:]
+    centr = Centroids.from_hdf5(hf_centr)
+    return centr.lat, centr.lon
+
+def _coord_key(lat, lon):
+    """ Complex view of coordinates, sortable and comparable element-wise """
+    return np.asarray(lat, dtype=float) + 1j*np.asarray(lon, dtype=float)
+
+def _match_coords(key_ref, key):
+    """ Position of every coordinate of key in key_ref (exact match) """
+    order = np.argsort(key_ref)
+    pos = np.searchsorted(key_ref[order], key).clip(0, key_ref.size-1)
+    idx = order[pos]
+    if not np.array_equal(key_ref[idx], key):
+        raise ValueError('Centroids not found in the union of all centroids.')
+    return idx
+
+def scan_hazard_files(file_list):
+    """
+    Read the sizes of hazard HDF5 files without loading the hazards.
+
+    Parameters
+    ----------
+    file_list : list of str or Path
+        Hazard files written by Hazard.write_hdf5.
+
+    Returns
+    -------
+    list of dict
+        One header per file with keys 'file', 'n_events', 'n_centroids', 'nnz'
+        (per CSR variable), 'dtype' (per CSR variable), 'centr_key' and 'event_id'.
+    """
+    headers = []
+    for file in file_list:
+        with h5py.File(file, 'r') as hf_data:
+            lat, lon = _centroid_coords(hf_data[CENTR_GROUP])
+            headers.append({
+                'file': Path(file),
+                'n_events': hf_data['event_id'].shape[0],
+                'n_centroids': lat.size,
+                'nnz': {var: hf_data[var]['data'].shape[0]
+                        for var in CSR_VARS if var in hf_data},
+                'dtype': {var: hf_data[var]['data'].dtype
+                          for var in CSR_VARS if var in hf_data},
+                'centr_key': _coord_key(lat, lon),
+                'event_id': hf_data['event_id'][:],
+                })
+    return headers
+
+def _concat_plan(headers):
+    """
+    Common centroids of all files and the column map of every file into them.
+
+    The centroids of the first file are used as they are if all files share them
+    (the usual case). Otherwise, the union is built as in Hazard.append and every
+    file gets an index array mapping its columns to the union.
+    """
+    key_ref = headers[0]['centr_key']
+    if all(np.array_equal(hdr['centr_key'], key_ref) for hdr in headers[1:]):
+        return None, [None]*len(headers)
+
+    LOGGER.info('Centroids differ between files, building their union.')
+    centr_list = []
+    for hdr in headers:
+        with h5py.File(hdr['file'], 'r') as hf_data:
+            centr_list.append(Centroids.from_hdf5(hf_data[CENTR_GROUP]))
+    centroids = centr_list[0].union(*centr_list[1:])
+    key_union = _coord_key(centroids.lat, centroids.lon)
+    col_maps = [_match_coords(key_union, hdr['centr_key']) for hdr in headers]
+    return centroids, col_maps
+
+def _event_ids(headers):
+    """ Concatenated event ids, renumbered if they are not unique (as in append) """
+    event_id = np.concatenate([hdr['event_id'] for hdr in headers])
+    if np.unique(event_id).size != event_id.size:
+        event_id = np.arange(1, event_id.size+1)
+    return event_id
+
+def _read_csr_arrays(hf_csr, n_events, col_map, n_cen):
+    """
+    data, indices, indptr of a stored CSR matrix, columns mapped by col_map.
+
+    An empty matrix (e.g. a fraction that was not set) gives empty rows.
+    """
+    shape = tuple(hf_csr.attrs['shape'])
+    if shape[0] == 0:
+        return (np.zeros(0), np.zeros(0, dtype=np.int32),
+                np.zeros(n_events+1, dtype=np.int64))
+    data = hf_csr['data'][:]
+    indices = hf_csr['indices'][:]
+    indptr = hf_csr['indptr'][:]
+    if col_map is not None:
+        mat = sparse.csr_matrix((data, col_map[indices], indptr),
+                                shape=(shape[0], n_cen))
+        mat.sort_indices()
+        data, indices, indptr = mat.data, mat.indices, mat.indptr
+    return data, indices, indptr
+
+def _read_event_var(hf_data, var):
+    values = hf_data[var][:]
+    if var in STR_EVENT_VARS:
+        return np.array([val.decode() if isinstance(val, bytes) else val
+                         for val in values], dtype=object)
+    return values
+
+def concat_hazard_files(file_list, out_file=None, max_workers=1):
+    """
+    Concatenate hazard HDF5 files in a single pass.
+
+    The result is identical to loading the first file and appending the others
+    with TropCyclone.append, but each file is read once and the CSR arrays of the
+    result are allocated once from the sizes in the file headers.
+
+    Parameters
+    ----------
+    file_list : list of str or Path
+        Hazard files written by Hazard.write_hdf5, concatenated in this order.
+    out_file : str or Path, optional
+        If given, the result is written chunk by chunk directly to this HDF5 file
+        (same layout as Hazard.write_hdf5) and never held in memory as a whole.
+    max_workers : int, optional
+        With out_file, number of processes reading the input files in parallel
+        while the result is written (None: number of CPUs). Default: 1, all
+        files are read in the main process.
+
+    Returns
+    -------
+    TropCyclone or None
+        The concatenated hazard, or None if out_file was given.
+    """
+    if not file_list:
+        raise ValueError('No hazard files to concatenate.')
+    headers = scan_hazard_files(file_list)
+    centroids, col_maps = _concat_plan(headers)
+    event_id = _event_ids(headers)
+    if out_file is not None:
+        _concat_to_hdf5(headers, centroids, col_maps, event_id, out_file, max_workers)
+        return None
+    return _concat_in_memory(headers, centroids, col_maps, event_id)
+
+def _alloc_sizes(headers, var):
+    """ Total number of events and non-zeros of a CSR variable over all files """
+    n_events = sum(hdr['n_events'] for hdr in headers)
+    nnz = sum(hdr['nnz'].get(var, 0) for hdr in headers)
+    idx_dtype = np.int32 if nnz < np.iinfo(np.int32).max else np.int64
+    return n_events, nnz, idx_dtype
+
+def _hazard_template(file, centroids=None):
+    """
+    TropCyclone with the attributes of a hazard file that are the same for all
+    files of a set (haz_type, units, frequency_unit, centroids, ...), read without
+    the CSR matrices and per-event variables.
+    """
+    haz = TropCyclone()
+    with h5py.File(file, 'r') as hf_data:
+        for var, val in hf_data.items():
+            if var in CSR_VARS or var in EVENT_VARS or not hasattr(haz, var):
+                continue
+            if var == CENTR_GROUP:
+                if centroids is None:
+                    haz.centroids = Centroids.from_hdf5(val)
+            elif isinstance(val, h5py.Dataset):
+                vals = val[()]
+                if val.dtype.kind in 'OS':
+                    vals = [v.decode() if isinstance(v, bytes) else v for v in vals]
+                    # scalar strings (haz_type, units, ...) are stored with shape (1,)
+                    if isinstance(getattr(haz, var), str):
+                        vals = vals[0]
+                setattr(haz, var, vals)
+    return haz
+
+def _concat_in_memory(headers, centroids, col_maps, event_id):
+    """ Fill preallocated CSR and event arrays and set them on a TropCyclone """
+    haz = _hazard_template(headers[0]['file'], centroids)
+    n_cen = headers[0]['n_centroids'] if centroids is None else centroids.size
+
+    csr_arrays = {}
+    for var in CSR_VARS:
+        n_events, nnz, idx_dtype = _alloc_sizes(headers, var)
+        csr_arrays[var] = (np.empty(nnz, dtype=headers[0]['dtype'].get(var, float)),
+                           np.empty(nnz, dtype=idx_dtype),
+                           np.zeros(n_events+1, dtype=idx_dtype))
+    event_vals = {var: [] for var in EVENT_VARS}
+
+    row_off = 0
+    nnz_off = dict.fromkeys(CSR_VARS, 0)
+    for hdr, col_map in zip(headers, col_maps):
+        with h5py.File(hdr['file'], 'r') as hf_data:
+            for var in CSR_VARS:
+                if var not in hf_data:
+                    continue
+                data, indices, indptr = _read_csr_arrays(
+                    hf_data[var], hdr['n_events'], col_map, n_cen)
+                out_data, out_indices, out_indptr = csr_arrays[var]
+                out_data[nnz_off[var]:nnz_off[var]+data.size] = data
+                out_indices[nnz_off[var]:nnz_off[var]+data.size] = indices
+                out_indptr[row_off+1:row_off+hdr['n_events']+1] = \
+                    indptr[1:].astype(np.int64) + nnz_off[var]
+                nnz_off[var] += data.size
+            for var in EVENT_VARS:
+                if var in hf_data:
+                    event_vals[var].append(_read_event_var(hf_data, var))
+        row_off += hdr['n_events']
+
+    for var in CSR_VARS:
+        setattr(haz, var, sparse.csr_matrix(csr_arrays[var], shape=(row_off, n_cen)))
+    for var, vals in event_vals.items():
+        if not vals:
+            continue
+        vals = np.concatenate(vals)
+        setattr(haz, var, vals.tolist() if var in STR_EVENT_VARS else vals)
+    haz.event_id = event_id
+    if centroids is not None:
+        haz.centroids = centroids
+    return haz
+
+def _read_file(file, n_events, col_map, n_cen, csr_vars, event_vars):
+    """ CSR arrays (columns mapped by col_map) and per-event values of a hazard file """
+    with h5py.File(file, 'r') as hf_data:
+        csr_vals = {var: _read_csr_arrays(hf_data[var], n_events, col_map, n_cen)
+                    for var in csr_vars}
+        event_vals = {var: hf_data[var][:] for var in event_vars}
+    return csr_vals, event_vals
+
+def _read_files(args, max_workers=1):
+    """
+    Yield (position, _read_file(*args[position])) for all files.
+
+    With max_workers > 1, the files are read by worker processes with at most
+    max_workers files in flight, so that only few files are held in memory.
+    """
+    if max_workers == 1:
+        for i_file, arg in enumerate(args):
+            yield i_file, _read_file(*arg)
+        return
+    n_slots = max_workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=n_slots) as executor:
+        pending = {}
+        for i_file, arg in enumerate(args):
+            pending[executor.submit(_read_file, *arg)] = i_file
+            if len(pending) >= n_slots:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        for future in as_completed(pending):
+            yield pending[future], future.result()
+
+def _concat_to_hdf5(headers, centroids, col_maps, event_id, out_file, max_workers=1):
+    """ Stream the files into out_file with datasets allocated at their final size """
+    LOGGER.info('Writing %s', out_file)
+    n_cen = headers[0]['n_centroids'] if centroids is None else centroids.size
+    with h5py.File(out_file, 'w') as hf_out:
+        with h5py.File(headers[0]['file'], 'r') as hf_first:
+            for var, val in hf_first.items():
+                if var in EVENT_VARS:
+                    hf_out.create_dataset(var, shape=(event_id.size,), dtype=val.dtype)
+                elif var in CSR_VARS:
+                    n_events, nnz, idx_dtype = _alloc_sizes(headers, var)
+                    hf_csr = hf_out.create_group(var)
+                    hf_csr.create_dataset('data', shape=(nnz,), dtype=val['data'].dtype)
+                    hf_csr.create_dataset('indices', shape=(nnz,), dtype=idx_dtype)
+                    hf_csr.create_dataset('indptr', shape=(n_events+1,), dtype=idx_dtype)
+                    hf_csr['indptr'][0] = 0
+                    hf_csr.attrs['shape'] = (n_events, n_cen)
+                elif var == CENTR_GROUP and centroids is None:
+                    hf_first.copy(val, hf_out, name=CENTR_GROUP)
+                elif var != CENTR_GROUP:
+                    hf_first.copy(val, hf_out, name=var)
+        if centroids is not None:
+            centroids.write_hdf5(hf_out.create_group(CENTR_GROUP))
+
+        # the offsets of every file are known from the headers, so the files can
+        # be read in any order and each is written to its place once read
+        row_offs = np.cumsum([0] + [hdr['n_events'] for hdr in headers])
+        nnz_offs = {var: np.cumsum([0] + [hdr['nnz'].get(var, 0) for hdr in headers])
+                    for var in CSR_VARS}
+        csr_vars = [var for var in CSR_VARS if var in hf_out]
+        event_vars = [var for var in EVENT_VARS if var in hf_out and var != 'event_id']
+        args = [(hdr['file'], hdr['n_events'], col_map, n_cen, csr_vars, event_vars)
+                for hdr, col_map in zip(headers, col_maps)]
+        for i_file, (csr_vals, event_vals) in _read_files(args, max_workers):
+            row_off, n_ev = row_offs[i_file], headers[i_file]['n_events']
+            for var, (data, indices, indptr) in csr_vals.items():
+                off = nnz_offs[var][i_file]
+                hf_out[var]['data'][off:off+data.size] = data
+                hf_out[var]['indices'][off:off+data.size] = indices
+                hf_out[var]['indptr'][row_off+1:row_off+n_ev+1] = indptr[1:].astype(np.int64) + off
+            for var, vals in event_vals.items():
+                hf_out[var][row_off:row_off+n_ev] = vals
+        hf_out['event_id'][:] = event_id
+
+def hazard_size(file):
+    """ Number of events of a hazard file """
+    with h5py.File(file, 'r') as hf_data:
+        return hf_data['event_id'].shape[0]
+
+def patch_hdf5_datasets(file, values):
+    """
+    Overwrite datasets of a hazard file in place, e.g. the frequency.
+
+    Datasets of the same shape and dtype are written into; others are replaced.
+    The intensity and fraction matrices are neither read nor rewritten.
+
+    Parameters
+    ----------
+    file : str or Path
+        Hazard file written by Hazard.write_hdf5.
+    values : dict
+        Dataset name -> new values.
+    """
+    with h5py.File(file, 'r+') as hf_data:
+        for var, val in values.items():
+            val = np.asarray(val)
+            if var in hf_data and hf_data[var].shape == val.shape \
+                    and hf_data[var].dtype == val.dtype:
+                hf_data[var][...] = val
+            else:
+                if var in hf_data:
+                    del hf_data[var]
+                hf_data.create_dataset(var, data=val)
+
+def copy_hazard_file(file, out_file, values=None):
+    """
+    Copy a hazard file byte by byte and patch datasets of the copy.
+
+    Parameters
+    ----------
+    file : str or Path
+        Hazard file written by Hazard.write_hdf5.
+    out_file : str or Path
+        Output file.
+    values : dict, optional
+        Dataset name -> new values, see patch_hdf5_datasets.
+    """
+    LOGGER.info('Copying %s to %s', file, out_file)
+    shutil.copyfile(file, out_file)
+    if values:
+        patch_hdf5_datasets(out_file, values)
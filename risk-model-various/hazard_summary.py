@@ -0,0 +1,223 @@
+"""
+Created on 2026-10-19
+
+description: Per-event summary of a hazard set, stored in a small sidecar file next
+             to every hazard file the scripts write: maximum intensity, number of
+             non-zero centroids, frequency, date and year of every event and
+             whether an event reaches each basin. The sidecar records the size,
+             modification time and SHA-256 hash of the hazard file it describes.
+             Frequency bias corrections, event filters and frequency/intensity
+             statistics then reduce to array operations on these summaries
+             instead of reading the intensity matrix.
+
+@author: simonameiler
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+import numpy as np
+import h5py
+
+from basin_split import BASIN_BOUNDS, centroid_basin_labels
+from hazard_freq import event_years
+from hazard_io import CENTR_GROUP, _centroid_coords
+
+LOGGER = logging.getLogger(__name__)
+
+SUMMARY_SUFFIX = '.summary.h5'
+
+############################################################################
+
+def event_summary(hazard, basin_bounds=BASIN_BOUNDS):
+    """
+    Per-event summary of a hazard in one pass over its intensity matrix.
+
+    Parameters
+    ----------
+    hazard : Hazard
+        Hazard set.
+    basin_bounds : dict, optional
+        Basin name -> [lonmin, lonmax, latmin, latmax]. Default: BASIN_BOUNDS
+
+    Returns
+    -------
+    dict
+        'max_intensity', 'nnz', 'frequency', 'date' and 'year' (n_events,),
+        'basin_touch' (n_events, n_basins), True where an event has non-zero
+        intensity at a centroid of the basin, and 'basins'.
+    """
+    inten = hazard.intensity
+    n_rows = inten.shape[0]
+    nnz_row = np.diff(inten.indptr)
+
+    max_int = np.zeros(n_rows)
+    has_nz = nnz_row > 0
+    if has_nz.any():
+        max_int[has_nz] = np.maximum.reduceat(inten.data, inten.indptr[:-1][has_nz])
+
+    labels = centroid_basin_labels(hazard.centroids.lat, hazard.centroids.lon, basin_bounds)
+    basin_touch = np.zeros((n_rows, len(basin_bounds)), dtype=bool)
+    _touch_basins(basin_touch, inten.data, inten.indices, nnz_row, labels)
+
+    return {'max_intensity': max_int,
+            'nnz': nnz_row,
+            'frequency': np.asarray(hazard.frequency),
+            'date': np.asarray(hazard.date),
+            'year': event_years(hazard.date),
+            'basin_touch': basin_touch,
+            'basins': list(basin_bounds)}
+
+def _touch_basins(basin_touch, data, indices, nnz_row, labels):
+    """ Mark the basins of the centroids with non-zero intensity of every event """
+    lab_nz = labels[indices]
+    sel = (data > 0) & (lab_nz >= 0)
+    row_nz = np.repeat(np.arange(nnz_row.size), nnz_row)
+    basin_touch[row_nz[sel], lab_nz[sel]] = True
+
+def event_summary_hdf5(file, basin_bounds=BASIN_BOUNDS, block_events=10000):
+    """
+    Per-event summary of a hazard file, as event_summary, with the intensity
+    matrix read in blocks of block_events events without loading the hazard.
+
+    Parameters
+    ----------
+    file : str or Path
+        Hazard file written by Hazard.write_hdf5.
+    basin_bounds : dict, optional
+        Basin name -> [lonmin, lonmax, latmin, latmax]. Default: BASIN_BOUNDS
+    block_events : int, optional
+        Number of events read at once. Default: 10000
+
+    Returns
+    -------
+    dict
+        Same keys as event_summary.
+    """
+    with h5py.File(file, 'r') as hf_data:
+        labels = centroid_basin_labels(*_centroid_coords(hf_data[CENTR_GROUP]), basin_bounds)
+        hf_csr = hf_data['intensity']
+        indptr = hf_csr['indptr'][:].astype(np.int64)
+        n_events = indptr.size - 1
+        nnz_row = np.diff(indptr)
+        max_int = np.zeros(n_events)
+        basin_touch = np.zeros((n_events, len(basin_bounds)), dtype=bool)
+        for row in range(0, n_events, block_events):
+            row_end = min(row + block_events, n_events)
+            start, end = indptr[row], indptr[row_end]
+            data = hf_csr['data'][start:end]
+            has_nz = nnz_row[row:row_end] > 0
+            if has_nz.any():
+                max_int[row:row_end][has_nz] = np.maximum.reduceat(
+                    data, indptr[row:row_end][has_nz] - start)
+            _touch_basins(basin_touch[row:row_end], data, hf_csr['indices'][start:end],
+                          nnz_row[row:row_end], labels)
+        date = hf_data['date'][:]
+        return {'max_intensity': max_int,
+                'nnz': nnz_row,
+                'frequency': hf_data['frequency'][:],
+                'date': date,
+                'year': event_years(date),
+                'basin_touch': basin_touch,
+                'basins': list(basin_bounds)}
+
+def freq_bias_corr(summary, yrly_freq, years):
+    """
+    Frequency of every event after bias correction, per basin.
+
+    The number of events with non-zero intensity in a basin is the column sum of
+    the basin touch mask ('global' counts all events with non-zero intensity), so
+    any set of reference frequencies can be applied without touching the hazard.
+
+    Parameters
+    ----------
+    summary : dict
+        Output of event_summary or read_summary.
+    yrly_freq : dict
+        Basin name (or 'global') -> observed yearly frequency of TCs.
+    years : float
+        Number of simulated years of the hazard set.
+
+    Returns
+    -------
+    dict
+        Basin name (or 'global') -> corrected frequency of each event.
+    """
+    num_tracks = dict(zip(summary['basins'], summary['basin_touch'].sum(axis=0)))
+    num_tracks['global'] = np.count_nonzero(summary['max_intensity'])
+    freq_corr = {}
+    for bsn, freq_IB in yrly_freq.items():
+        cor = freq_IB/(num_tracks[bsn]/years)
+        freq_corr[bsn] = cor/years
+    return freq_corr
+
+def summary_file(haz_file):
+    """ Path of the sidecar summary file of a hazard file """
+    haz_file = Path(haz_file)
+    return haz_file.with_name(haz_file.name.rsplit('.hdf5', 1)[0] + SUMMARY_SUFFIX)
+
+def content_hash(file, block_size=2**24):
+    """ SHA-256 hex digest of the bytes of file """
+    sha = hashlib.sha256()
+    with open(file, 'rb') as fh:
+        for block in iter(lambda: fh.read(block_size), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+def write_summary(haz_file, summary):
+    """
+    Write the per-event summary next to the hazard file, with the size,
+    modification time and content hash of the hazard file. Call it after the
+    hazard file is written (and patched).
+    """
+    sum_file = summary_file(haz_file)
+    LOGGER.info('Writing %s', sum_file)
+    stat = Path(haz_file).stat()
+    with h5py.File(sum_file, 'w') as hf_sum:
+        for var, val in summary.items():
+            if var == 'basins':
+                hf_sum.attrs['basins'] = val
+            else:
+                hf_sum.create_dataset(var, data=val)
+        hf_sum.attrs['file_size'] = stat.st_size
+        hf_sum.attrs['file_mtime'] = stat.st_mtime
+        hf_sum.attrs['content_hash'] = content_hash(haz_file)
+
+def update_summary(haz_file, basin_bounds=BASIN_BOUNDS, block_events=10000):
+    """ Compute the summary of a hazard file with event_summary_hdf5 and write it """
+    summary = event_summary_hdf5(haz_file, basin_bounds, block_events)
+    write_summary(haz_file, summary)
+    return summary
+
+def summary_is_current(haz_file):
+    """ Whether the sidecar exists and matches the size and mtime of the hazard file """
+    sum_file = summary_file(haz_file)
+    if not sum_file.is_file():
+        return False
+    stat = Path(haz_file).stat()
+    with h5py.File(sum_file, 'r') as hf_sum:
+        return (hf_sum.attrs.get('file_size') == stat.st_size
+                and hf_sum.attrs.get('file_mtime') == stat.st_mtime)
+
+def read_summary(haz_file, verify=False):
+    """
+    Read the per-event summary stored next to the hazard file.
+
+    With verify=True, the content hash of the hazard file is recomputed and a
+    ValueError is raised if it differs from the one of the sidecar.
+    """
+    with h5py.File(summary_file(haz_file), 'r') as hf_sum:
+        summary = {var: val[()] for var, val in hf_sum.items()}
+        summary['basins'] = [bsn.decode() if isinstance(bsn, bytes) else str(bsn)
+                             for bsn in hf_sum.attrs.get('basins', [])]
+        stored_hash = hf_sum.attrs.get('content_hash')
+    if verify and stored_hash != content_hash(haz_file):
+        raise ValueError(f'{summary_file(haz_file)} does not match {haz_file}')
+    return summary
+
+def load_summary(haz_file, verify=False):
+    """ Per-event summary of a hazard file, from its sidecar if current, else computed and written """
+    if summary_is_current(haz_file):
+        return read_summary(haz_file, verify)
+    LOGGER.info('No current summary of %s', haz_file)
+    return update_summary(haz_file)
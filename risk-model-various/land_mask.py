@@ -0,0 +1,181 @@
+"""
+Created on 2026-10-19
+
+description: Tiled land mask on regular lat/lon grids. The buffered Natural Earth
+             land polygons are rasterized band by band (full-width bands of grid
+             rows) at the target resolution in parallel worker processes, instead
+             of a global unary_union and point-in-polygon tests on every grid point.
+             The surviving grid points are streamed to an HDF5 build file so that
+             interrupted builds resume with the bands still missing.
+
+@author: simonameiler
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import h5py
+import shapely.geometry
+import cartopy.io.shapereader as shpreader
+from rasterio import Affine
+from rasterio.features import rasterize
+
+# import CLIMADA modules:
+import climada.util.coordinates as u_coord
+
+LOGGER = logging.getLogger(__name__)
+
+# land polygons and their bounds, loaded once per worker process
+_LAND_GEOMS = None
+_LAND_BOUNDS = None
+
+############################################################################
+
+def load_land_geometries():
+    """ Natural Earth 10m land polygons and an array of their bounds """
+    shpfilename = shpreader.natural_earth(category='physical', name='land', resolution='10m')
+    land = shpreader.Reader(shpfilename)
+    land_geometrys = np.array([x.geometry for x in land.records()], dtype=object)
+    land_bounds = np.array([geom.bounds for geom in land_geometrys])
+    return land_geometrys, land_bounds
+
+def _init_worker():
+    global _LAND_GEOMS, _LAND_BOUNDS
+    _LAND_GEOMS, _LAND_BOUNDS = load_land_geometries()
+
+def rasterize_land(transform, shape, land_buffer, land_geoms=None, land_bounds=None):
+    """
+    Buffered land mask of a raster window, 1 where the pixel center is on land.
+
+    Only the polygons near the window are used; they are clipped to the window
+    (enlarged by twice the buffer) before buffering, which gives the same mask
+    as buffering the full polygons.
+
+    Parameters
+    ----------
+    transform : rasterio.Affine
+        Transform of the window.
+    shape : tuple
+        (rows, cols) of the window.
+    land_buffer : float
+        Buffer around the land polygons in degrees.
+    land_geoms, land_bounds : np.array, optional
+        Output of load_land_geometries. Default: the polygons of the worker.
+
+    Returns
+    -------
+    np.array of uint8
+    """
+    if land_geoms is None:
+        land_geoms, land_bounds = _LAND_GEOMS, _LAND_BOUNDS
+    x_min = transform.c
+    y_max = transform.f
+    x_max = x_min + shape[1]*transform.a
+    y_min = y_max + shape[0]*transform.e
+    margin = 2*land_buffer
+    clip = shapely.geometry.box(x_min-margin, y_min-margin, x_max+margin, y_max+margin)
+    sel = ((land_bounds[:, 0] <= x_max+margin) & (land_bounds[:, 2] >= x_min-margin) &
+           (land_bounds[:, 1] <= y_max+margin) & (land_bounds[:, 3] >= y_min-margin))
+    shapes = []
+    for geom in land_geoms[sel]:
+        geom = geom.intersection(clip)
+        if not geom.is_empty:
+            shapes.append(geom.buffer(land_buffer, resolution=10))
+    if not shapes:
+        return np.zeros(shape, dtype=np.uint8)
+    return rasterize(shapes, out_shape=shape, transform=transform, fill=0,
+                     default_value=1, dtype='uint8', all_touched=False)
+
+def _band_cells(transform, cols, row_start, row_end, land_buffer, keep_land):
+    """ Flat grid indices of the kept cells of the rows row_start:row_end """
+    band_trans = Affine(transform.a, transform.b, transform.c,
+                        transform.d, transform.e, transform.f + row_start*transform.e)
+    mask = rasterize_land(band_trans, (row_end-row_start, cols), land_buffer)
+    keep = mask.astype(bool) if keep_land else ~mask.astype(bool)
+    return np.flatnonzero(keep).astype(np.int64) + row_start*cols
+
+def _grid_coords(cells, transform, cols):
+    """ lat, lon of flat grid indices, as in Centroids.set_meta_to_lat_lon """
+    row, col = np.divmod(cells, cols)
+    lon = (transform.c + transform.a/2) + col*transform.a
+    lat = (transform.f + transform.e/2) + row*transform.e
+    return lat, lon
+
+def masked_grid_points(build_file, name, bounds, res, land_buffer, keep_land=True,
+                       band_deg=5., max_workers=None):
+    """
+    Points of a regular grid that lie on (or off) the buffered land.
+
+    The grid is the one of Centroids.from_pnt_bounds(bounds, res). Bands of rows
+    are rasterized in parallel; the indices of the kept cells of every finished
+    band are appended to the group `name` of build_file, together with the band's
+    position. Bands already in the build file are not computed again, so a build
+    that was interrupted resumes where it stopped.
+
+    Parameters
+    ----------
+    build_file : str or Path
+        HDF5 file holding the partial results.
+    name : str
+        Group of the build file for this grid (e.g. 'land', 'ocean').
+    bounds : tuple
+        (lon_min, lat_min, lon_max, lat_max) of the grid points.
+    res : float
+        Grid resolution in degrees.
+    land_buffer : float
+        Buffer around the land polygons in degrees.
+    keep_land : bool, optional
+        Keep the points on land (True) or the points off land (False).
+    band_deg : float, optional
+        Height of a band in degrees. Default: 5
+    max_workers : int, optional
+        Number of worker processes. Default: number of CPUs
+
+    Returns
+    -------
+    lat, lon : np.array
+        Kept grid points, in the row-major order of the grid.
+    """
+    rows, cols, transform = u_coord.pts_to_raster_meta(bounds, (res, -res))
+    band_rows = max(1, int(round(band_deg/res)))
+    bands = [(row, min(rows, row+band_rows)) for row in range(0, rows, band_rows)]
+    params = {'bounds': bounds, 'res': res, 'land_buffer': land_buffer,
+              'keep_land': keep_land, 'band_rows': band_rows}
+
+    with h5py.File(build_file, 'a') as hf_build:
+        grp = hf_build.require_group(name)
+        if 'band_count' in grp:
+            for key, val in params.items():
+                if not np.array_equal(grp.attrs[key], val):
+                    raise ValueError(f'Build file {build_file} was started with '
+                                     f'different {key}: {grp.attrs[key]}')
+        else:
+            grp.attrs.update(params)
+            grp.create_dataset('cells', shape=(0,), maxshape=(None,), dtype=np.int64,
+                               chunks=(2**20,))
+            grp.create_dataset('band_start', data=np.zeros(len(bands), dtype=np.int64))
+            grp.create_dataset('band_count', data=np.full(len(bands), -1, dtype=np.int64))
+
+        todo = np.flatnonzero(grp['band_count'][:] < 0)
+        LOGGER.info('%s: %s of %s bands to compute.', name, todo.size, len(bands))
+        if todo.size:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     initializer=_init_worker) as executor:
+                futures = {executor.submit(_band_cells, transform, cols, *bands[i_band],
+                                           land_buffer, keep_land): i_band
+                           for i_band in todo}
+                for future in as_completed(futures):
+                    i_band = futures[future]
+                    cells = future.result()
+                    start = grp['cells'].shape[0]
+                    grp['cells'].resize((start+cells.size,))
+                    grp['cells'][start:] = cells
+                    grp['band_start'][i_band] = start
+                    grp['band_count'][i_band] = cells.size
+                    hf_build.flush()
+
+        band_start = grp['band_start'][:]
+        band_count = grp['band_count'][:]
+        cells = np.concatenate([grp['cells'][start:start+count]
+                                for start, count in zip(band_start, band_count)])
+    return _grid_coords(cells, transform, cols)
@@ -0,0 +1,342 @@
+"""
+Created on 2026-10-19
+
+description: Columnar store of TC tracks. The time series of all tracks are held in
+             flat arrays (one per variable) with the offsets of the tracks, and the
+             per-track attributes in one array each, instead of one xarray Dataset
+             per track as in TCTracks.data. The store converts from and to TCTracks
+             (e.g. chunk by chunk for the wind field computation) and is written as
+             one netCDF (or Zarr) file in the contiguous ragged array layout of the
+             CF conventions instead of one file per track.
+
+@author: simonameiler
+"""
+
+import logging
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import xarray as xr
+from scipy.interpolate import interp1d
+
+# import CLIMADA modules:
+from climada.hazard import TCTracks
+from climada.hazard.tc_tracks import SAFFIR_SIM_CAT
+from climada.util import ureg
+import climada.util.coordinates as u_coord
+
+LOGGER = logging.getLogger(__name__)
+
+# variables that are coordinates of the track Datasets
+COORD_VARS = ('time', 'lat', 'lon')
+
+############################################################################
+
+def _py_value(val):
+    """ numpy scalar -> python scalar, as the attributes of TCTracks """
+    return val.item() if isinstance(val, np.generic) else val
+
+def _seg_search(seg_xp, xp, seg_x, x, side):
+    """
+    np.searchsorted of x in xp within the track segments of both: the complex keys
+    sort by track first and by time second, so one call serves all tracks.
+    """
+    return np.searchsorted(seg_xp + 1j*xp, seg_x + 1j*x, side=side)
+
+def _interp_linear(idx_lo, is_last, x, xp, fp):
+    """
+    np.interp evaluated for all tracks at once, given the index of the last
+    sample xp <= x of every point (the same operations, hence the same results).
+    """
+    fp = fp.astype(np.float64)
+    idx_hi = np.where(is_last, idx_lo, idx_lo+1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = (fp[idx_hi] - fp[idx_lo]) / (xp[idx_hi] - xp[idx_lo])
+        res = slope*(x - xp[idx_lo]) + fp[idx_lo]
+        redo = np.isnan(res)
+        res[redo] = slope[redo]*(x[redo] - xp[idx_hi[redo]]) + fp[idx_hi[redo]]
+    redo &= np.isnan(res) & (fp[idx_lo] == fp[idx_hi])
+    res[redo] = fp[idx_lo[redo]]
+    exact = is_last | (x == xp[idx_lo])
+    res[exact] = fp[idx_lo[exact]]
+    return res
+
+def _spline_groups(offsets_old, offsets_new, x_old, x_new, tracks):
+    """
+    Index arrays (n_tracks, n_steps) of the old and new time steps of groups of
+    tracks with the same relative times, and the spline kind of TCTracks
+    (quadratic for 3 steps, cubic for more). The splines of a group are computed
+    in one call, with the same results as track by track.
+    """
+    groups = {}
+    for i_track in tracks:
+        old = slice(offsets_old[i_track], offsets_old[i_track+1])
+        new = slice(offsets_new[i_track], offsets_new[i_track+1])
+        if new.start == new.stop:
+            continue
+        groups.setdefault((x_old[old].tobytes(), x_new[new].tobytes()), []).append(i_track)
+    for i_tracks in groups.values():
+        i_tracks = np.array(i_tracks)
+        n_old = offsets_old[i_tracks[0]+1] - offsets_old[i_tracks[0]]
+        n_new = offsets_new[i_tracks[0]+1] - offsets_new[i_tracks[0]]
+        yield (offsets_old[i_tracks][:, None] + np.arange(n_old),
+               offsets_new[i_tracks][:, None] + np.arange(n_new),
+               'quadratic' if n_old == 3 else 'cubic')
+
+def _category(max_wind, wind_unit):
+    """ set_category for the maximum wind of every track """
+    scale = np.asarray(SAFFIR_SIM_CAT, dtype=float)
+    if wind_unit != 'kn':
+        max_wind = ureg.Quantity(max_wind, ureg.parse_units(wind_unit)).to('kn').magnitude
+    cat = np.searchsorted(scale, max_wind, side='right') - 1
+    cat[np.isnan(max_wind) | (cat >= scale.size-1)] = -1
+    return cat
+
+class RaggedTracks():
+    """
+    Tracks as flat arrays with offsets.
+
+    Attributes
+    ----------
+    variables : dict
+        Variable name -> array of the values of all tracks, one after the other.
+        Contains the coordinates 'time', 'lat' and 'lon'.
+    offsets : np.array
+        Start of every track in the variables, with the total length appended.
+    attrs : dict
+        Attribute name -> array with the value of every track.
+    """
+
+    def __init__(self, variables, offsets, attrs):
+        self.variables = variables
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.attrs = attrs
+
+    @property
+    def size(self):
+        """ Number of tracks """
+        return self.offsets.size - 1
+
+    @property
+    def lat(self):
+        return self.variables['lat']
+
+    @property
+    def lon(self):
+        return self.variables['lon']
+
+    @classmethod
+    def from_tctracks(cls, tracks):
+        """
+        Columnar copy of the tracks of a TCTracks object.
+
+        All tracks must have the same variables and attributes.
+        """
+        data = tracks.data
+        if not data:
+            return cls({var: np.zeros(0) for var in COORD_VARS}, [0], {})
+        var_names = list(COORD_VARS) + [var for var in data[0].data_vars]
+        attr_names = list(data[0].attrs)
+        for track in data[1:]:
+            if set(track.data_vars) != set(data[0].data_vars) \
+                    or set(track.attrs) != set(attr_names):
+                raise ValueError(f'Track {track.attrs.get("sid")} has other variables '
+                                 'or attributes than the first track.')
+        offsets = np.zeros(len(data)+1, dtype=np.int64)
+        offsets[1:] = np.cumsum([track.time.size for track in data])
+        variables = {var: np.concatenate([track[var].values for track in data])
+                     for var in var_names}
+        attrs = {key: np.array([track.attrs[key] for track in data]) for key in attr_names}
+        return cls(variables, offsets, attrs)
+
+    def _track(self, i_track):
+        start, end = self.offsets[i_track], self.offsets[i_track+1]
+        coords = {'time': self.variables['time'][start:end].copy(),
+                  'lat': ('time', self.variables['lat'][start:end].copy()),
+                  'lon': ('time', self.variables['lon'][start:end].copy())}
+        data_vars = {var: ('time', arr[start:end].copy())
+                     for var, arr in self.variables.items() if var not in COORD_VARS}
+        attrs = {key: _py_value(val[i_track]) for key, val in self.attrs.items()}
+        return xr.Dataset(data_vars, coords=coords, attrs=attrs)
+
+    def to_tctracks(self, sel=None):
+        """
+        TCTracks with one Dataset per track.
+
+        Parameters
+        ----------
+        sel : slice or np.array, optional
+            Tracks to convert (e.g. a chunk of the set). Default: all
+
+        Returns
+        -------
+        TCTracks
+        """
+        idx = np.arange(self.size)
+        if sel is not None:
+            idx = idx[sel]
+        return TCTracks([self._track(i_track) for i_track in idx])
+
+    def get_bounds(self, deg_buffer=0.1):
+        """ Bounds of all track positions, as TCTracks.get_bounds """
+        return u_coord.latlon_bounds(self.lat, self.lon, buffer=deg_buffer)
+
+    def get_extent(self, deg_buffer=0.1):
+        """ Extent (lon_min, lon_max, lat_min, lat_max), as TCTracks.get_extent """
+        bounds = self.get_bounds(deg_buffer=deg_buffer)
+        return (bounds[0], bounds[2], bounds[1], bounds[3])
+
+    def equal_timestep(self, time_step_h=1.):
+        """
+        Resample all tracks to time steps of time_step_h hours in place, with the
+        results of TCTracks.equal_timestep (without land parameters).
+
+        All tracks are interpolated together on the flat arrays: float variables
+        linearly (as np.interp), other variables to the nearest time step (ties to
+        the later one), and the category is updated. The new time steps are the
+        multiples of time_step_h from midnight of the first day of a track within
+        its first and last time step. Only lat/lon of tracks with more than two
+        time steps are interpolated with a quadratic (3 steps) or
+        cubic (more steps) spline as in TCTracks, in groups of tracks with the
+        same relative times. Tracks with less than two time steps are kept as
+        they are.
+
+        Parameters
+        ----------
+        time_step_h : float, optional
+            Time step in hours. Default: 1
+        """
+        if time_step_h <= 0:
+            raise ValueError('time_step_h is not a positive number.')
+        sizes = np.diff(self.offsets)
+        n_tracks = self.size
+        resample = sizes >= 2
+        # integer times in the unit of the time array, which is also the unit of
+        # the float times xarray interpolates on
+        unit = np.datetime_data(self.variables['time'].dtype)[0]
+        step = np.timedelta64(pd.Timedelta(hours=time_step_h)).astype(
+            f'timedelta64[{unit}]').astype(np.int64)
+        day = np.timedelta64(1, 'D').astype(f'timedelta64[{unit}]').astype(np.int64)
+        time = self.variables['time'].astype(np.int64)
+        seg_old = np.repeat(np.arange(n_tracks), sizes)
+        t_first = np.zeros(n_tracks, dtype=np.int64)
+        t_last = np.zeros(n_tracks, dtype=np.int64)
+        t_first[sizes > 0] = time[self.offsets[:-1][sizes > 0]]
+        t_last[sizes > 0] = time[self.offsets[1:][sizes > 0] - 1]
+
+        # new time steps within [t_first, t_last], anchored at midnight of the first day
+        origin = t_first - t_first % day
+        first = origin + (t_first - origin + step - 1)//step*step
+        last = origin + (t_last - origin)//step*step
+        n_new = np.where(resample, np.maximum((last - first)//step + 1, 0), sizes)
+        offsets = np.zeros(n_tracks+1, dtype=np.int64)
+        offsets[1:] = np.cumsum(n_new)
+        seg_new = np.repeat(np.arange(n_tracks), n_new)
+        pos_new = np.arange(offsets[-1]) - offsets[:-1][seg_new]
+        res_new = resample[seg_new]
+
+        # keep the points of the other tracks: map them onto themselves
+        time_new = first[seg_new] + pos_new*step
+        keep_old = ~resample[seg_old]
+        time_new[~res_new] = time[keep_old]
+
+        # time relative to the first time step of each track, as float (as xarray)
+        x_old = (time - t_first[seg_old]).astype(np.float64)
+        x_new = (time_new - t_first[seg_new]).astype(np.float64)
+        idx_lo = _seg_search(seg_old, x_old, seg_new, x_new, 'right') - 1
+        is_last = idx_lo == self.offsets[1:][seg_new] - 1
+        idx_hi = _seg_search(seg_old, x_old, seg_new, x_new, 'left')
+        idx_hi = np.minimum(idx_hi, self.offsets[1:][seg_new] - 1)
+        nearest = np.where(x_new - x_old[idx_lo] < x_old[idx_hi] - x_new, idx_lo, idx_hi)
+
+        lon = u_coord.lon_normalize(self.variables['lon'].astype(np.float64), center=0)
+        cross = np.zeros(n_tracks, dtype=bool)
+        has_pts = sizes > 0
+        cross[has_pts] = (np.logical_or.reduceat(lon < -170, self.offsets[:-1][has_pts])
+                          & np.logical_or.reduceat(lon > 170, self.offsets[:-1][has_pts]))
+        lon[cross[seg_old] & (lon < 0)] += 360
+
+        splines = list(_spline_groups(self.offsets, offsets, x_old, x_new,
+                                      np.flatnonzero(sizes > 2)))
+        variables = {}
+        for var, arr in self.variables.items():
+            if var == 'time':
+                variables[var] = time_new.astype(f'datetime64[{unit}]')
+                continue
+            if var in ('lat', 'lon'):
+                src = lon if var == 'lon' else arr
+                val = _interp_linear(idx_lo, is_last, x_new, x_old, src)
+                for idx_old, idx_new, kind in splines:
+                    val[idx_new] = interp1d(x_old[idx_old[0]], src[idx_old], kind=kind,
+                                            axis=-1, bounds_error=False,
+                                            assume_sorted=True)(x_new[idx_new[0]])
+                if var == 'lon':
+                    val[val > 180] -= 360
+            elif var == 'time_step':
+                val = np.full(offsets[-1], float(time_step_h))
+            elif arr.dtype.kind == 'f':
+                val = _interp_linear(idx_lo, is_last, x_new, x_old, arr)
+            else:
+                val = arr[nearest]
+            val[~res_new] = arr[keep_old]
+            variables[var] = val
+
+        if 'max_sustained_wind' in variables:
+            max_wind = np.full(n_tracks, np.nan)
+            max_wind[n_new > 0] = np.fmax.reduceat(variables['max_sustained_wind'],
+                                                   offsets[:-1][n_new > 0])
+            units = self.attrs.get('max_sustained_wind_unit', np.full(n_tracks, 'kn'))
+            category = np.array(self.attrs.get('category', np.full(n_tracks, -1)))
+            for unit in np.unique(units[resample]):
+                sel = resample & (units == unit)
+                category[sel] = _category(max_wind[sel], str(unit))
+            self.attrs['category'] = category
+
+        self.variables = variables
+        self.offsets = offsets
+
+    def write_netcdf(self, file_name):
+        """
+        Write all tracks to one file, as netCDF or as Zarr if file_name ends with
+        '.zarr'. The time series share the dimension 'obs', the attributes and the
+        number of time steps ('row_size') of the tracks the dimension 'track'.
+        """
+        clash = set(self.attrs) & (set(self.variables) | {'row_size'})
+        if clash:
+            raise ValueError(f'Attributes with the names of variables: {clash}')
+        data_vars = {var: ('obs', arr) for var, arr in self.variables.items()}
+        data_vars['row_size'] = ('track', np.diff(self.offsets),
+                                 {'sample_dimension': 'obs'})
+        for key, val in self.attrs.items():
+            data_vars[key] = ('track', val)
+        ds_ragged = xr.Dataset(data_vars, attrs={
+            'featureType': 'trajectory',
+            'track_variables': list(self.variables)})
+        if self.attrs:
+            ds_ragged.attrs['track_attributes'] = list(self.attrs)
+        LOGGER.info('Writing %s tracks to %s', self.size, file_name)
+        if str(file_name).endswith('.zarr'):
+            ds_ragged.to_zarr(file_name, mode='w')
+        else:
+            ds_ragged.to_netcdf(file_name)
+
+    @classmethod
+    def from_netcdf(cls, file_name):
+        """ Read a file written with write_netcdf """
+        if str(file_name).endswith('.zarr'):
+            ds_ragged = xr.open_zarr(file_name)
+        else:
+            ds_ragged = xr.open_dataset(file_name)
+        with ds_ragged:
+            offsets = np.zeros(ds_ragged.sizes['track']+1, dtype=np.int64)
+            offsets[1:] = np.cumsum(ds_ragged['row_size'].values)
+            variables = {str(var): ds_ragged[var].values
+                         for var in np.atleast_1d(ds_ragged.attrs['track_variables'])}
+            attrs = {str(key): ds_ragged[key].values
+                     for key in np.atleast_1d(ds_ragged.attrs.get('track_attributes', []))}
+        return cls(variables, offsets, attrs)
+
+def ragged_file(track_dir):
+    """ Path of the single track file replacing the track folder track_dir """
+    track_dir = Path(track_dir)
+    return track_dir.with_name(track_dir.name + '.nc')
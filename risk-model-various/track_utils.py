@@ -0,0 +1,65 @@
+"""
+Created on 2026-10-19
+
+description: Single-pass selection of tracks of a TCTracks object. The predicates on
+             per-track attributes (or variables) are evaluated once per track and
+             the selected tracks are returned as views, i.e. the same xarray
+             Datasets, without copying any track data.
+
+@author: simonameiler
+"""
+
+import numpy as np
+
+# import CLIMADA modules:
+from climada.hazard import TCTracks
+
+############################################################################
+
+def _track_value(track, name):
+    """ Attribute of a track, or its variable if there is no such attribute """
+    if name in track.attrs:
+        return track.attrs[name]
+    return track[name]
+
+def _matches(value, predicate):
+    if callable(predicate):
+        return bool(predicate(value))
+    if isinstance(predicate, (list, tuple, set, frozenset, range, np.ndarray)):
+        return value in predicate
+    return value == predicate
+
+def select_tracks(tracks, order_by=None, **predicates):
+    """
+    Tracks that fulfil all predicates, in one pass over the tracks.
+
+    Parameters
+    ----------
+    tracks : TCTracks
+        Tracks to select from. They are not copied.
+    order_by : str, optional
+        Attribute by which the selected tracks are stably sorted, e.g. 'category'
+        to get the order of a loop of subsets over the categories.
+    **predicates
+        Attribute (or variable) name -> condition. A condition is a callable taking
+        the value and returning a bool, a collection (list, tuple, set, range,
+        np.array) of accepted values, or a single accepted value.
+
+    Returns
+    -------
+    TCTracks
+        Tracks whose data list holds the selected Datasets of tracks. Changing a
+        track of the result in place changes it in tracks as well.
+
+    Examples
+    --------
+    >>> select_tracks(tracks, category=range(0, 6), order_by='category')
+    >>> select_tracks(tracks, time=lambda time: time.size > 1)
+    """
+    data = [track for track in tracks.data
+            if all(_matches(_track_value(track, name), pred)
+                   for name, pred in predicates.items())]
+    if order_by is not None:
+        keys = np.array([_track_value(track, order_by) for track in data])
+        data = [data[i] for i in np.argsort(keys, kind='stable')]
+    return TCTracks(data)